@@ -32,6 +32,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'recipes.instrumentation.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,8 +60,21 @@ TEMPLATES = [
     },
 ]
 
+ASGI_APPLICATION = 'foodgram.asgi.application'
+
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False') == 'True'
+
 WSGI_APPLICATION = 'foodgram.wsgi.application'
 
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -133,5 +147,39 @@ STATIC_ROOT = BASE_DIR / 'static'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+QUERY_BUDGETS = {
+    'RecipeViewSet': {'queries': 20, 'duplicates': 2},
+    'RecipeViewSet.list': {'queries': 8, 'duplicates': 0},
+    'RecipeViewSet.retrieve': {'queries': 9, 'duplicates': 0},
+    'RecipeViewSet.download_shopping_cart': {'queries': 2, 'duplicates': 0},
+    'RecipeViewSet.feed': {'queries': 10, 'duplicates': 0},
+    'UserViewSet': {'queries': 8, 'duplicates': 2},
+    'UserViewSet.subscribe': {'queries': 14, 'duplicates': 2},
+    'UserViewSet.subscriptions': {'queries': 6, 'duplicates': 0},
+    'IngredientViewSet': {'queries': 3, 'duplicates': 0},
+    'TagViewSet': {'queries': 3, 'duplicates': 0},
+}
+QUERY_BUDGET_RAISE = os.getenv('QUERY_BUDGET_RAISE', 'False') == 'True'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'instrumentation': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'recipes.instrumentation': {
+            'handlers': ['instrumentation'],
+            'level': os.getenv('INSTRUMENTATION_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -4,12 +4,19 @@ from .models import (
     Ingredient, Tag, Recipe,
     Favorites, ShoppingCart, IngredientsInRecipe
 )
+from .pagination import EstimatedCountPaginator
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Ingredient)
-class IngredientAdmin(admin.ModelAdmin):
+class IngredientAdmin(LargeTableAdmin):
     list_display = ('pk', 'name', 'measurement_unit')
-    list_filter = ('name',)
+    list_filter = ('measurement_unit',)
+    search_fields = ('name',)
 
 
 @admin.register(Tag)
@@ -23,49 +30,62 @@ class IngredientInline(admin.TabularInline):
     model = IngredientsInRecipe
     extra = 1
     min_num = 1
+    autocomplete_fields = ('ingredient',)
 
 
 @admin.register(Recipe)
-class RecipeAdmin(admin.ModelAdmin):
+class RecipeAdmin(LargeTableAdmin):
     list_display = (
         'pk', 'name', 'author', 'display_ingredients', 'in_favorites'
     )
     list_editable = ('name', 'author')
-    list_filter = ('name', 'author', 'tags')
+    list_filter = ('tags',)
+    list_select_related = ('author',)
+    search_fields = ('name',)
+    autocomplete_fields = ('author',)
     empty_value_display = '-пусто-'
     inlines = [
         IngredientInline,
     ]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('ingredients')
+
     @admin.display(description='Ингредиенты')
     def display_ingredients(self, obj):
         ingredients_list = ', '.join(
             [
-                ingredient.ingredient.name
+                ingredient.name
                 for ingredient in obj.ingredients.all()
-                if ingredient.ingredient.name
+                if ingredient.name
             ]
         )
         return ingredients_list
 
-    @admin.display(description='Избранное')
+    @admin.display(description='Избранное', ordering='favorites_count')
     def in_favorites(self, obj):
-        return obj.favorites_recipe.count()
+        return obj.favorites_count
 
 
 @admin.register(IngredientsInRecipe)
-class IngredientsInRecipe(admin.ModelAdmin):
+class IngredientsInRecipe(LargeTableAdmin):
     list_display = ('pk', 'recipe', 'ingredient', 'amount')
     list_editable = ('recipe', 'ingredient', 'amount')
+    list_select_related = ('recipe', 'ingredient')
+    autocomplete_fields = ('recipe', 'ingredient')
 
 
 @admin.register(Favorites)
-class FavoriteAdmin(admin.ModelAdmin):
+class FavoriteAdmin(LargeTableAdmin):
     list_display = ('pk', 'user', 'recipe')
     list_editable = ('user', 'recipe')
+    list_select_related = ('user', 'recipe')
+    autocomplete_fields = ('user', 'recipe')
 
 
 @admin.register(ShoppingCart)
-class ShoppingCartAdmin(admin.ModelAdmin):
+class ShoppingCartAdmin(LargeTableAdmin):
     list_display = ('pk', 'user', 'recipe')
     list_editable = ('user', 'recipe')
+    list_select_related = ('user', 'recipe')
+    autocomplete_fields = ('user', 'recipe')
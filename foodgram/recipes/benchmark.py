@@ -0,0 +1,235 @@
+import base64
+import io
+import statistics
+import tracemalloc
+from time import perf_counter
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from recipes.counters import reconcile_all
+from recipes.feed import backfill_timeline
+from recipes.models import (
+    Favorites, Ingredient, IngredientsInRecipe, Recipe, ShoppingCart, Tag
+)
+from users.models import Follow, User
+
+
+PREFIX = 'benchmark'
+TAGS = 5
+NOISE = {'median_ms': 2.0, 'peak_kib': 0.0}
+
+
+def sample(rng, population, size):
+    return rng.sample(population, min(size, len(population)))
+
+
+def create(model, objects, **lookup):
+    model.objects.bulk_create(objects)
+    return list(model.objects.filter(**lookup).order_by('id'))
+
+
+def generate(rng, users, recipes, ingredients, ingredients_per_recipe,
+             follows, favorites, carts):
+    password = make_password(PREFIX)
+    users = create(
+        User,
+        (User(
+            email=f'{PREFIX}-{index}@example.com',
+            username=f'{PREFIX}-{index}',
+            first_name=f'Имя {index}',
+            last_name=f'Фамилия {index}',
+            password=password,
+        ) for index in range(users)),
+        username__startswith=PREFIX
+    )
+    tags = create(
+        Tag,
+        (Tag(
+            name=f'{PREFIX} {index}',
+            slug=f'{PREFIX}-{index}',
+            color=f'#BE{index:04X}',
+        ) for index in range(TAGS)),
+        slug__startswith=PREFIX
+    )
+    ingredients = create(
+        Ingredient,
+        (Ingredient(
+            name=f'{PREFIX} ингредиент {index:05d}',
+            measurement_unit=rng.choice(('г', 'мл', 'шт.')),
+        ) for index in range(ingredients)),
+        name__startswith=PREFIX
+    )
+    recipes = create(
+        Recipe,
+        (Recipe(
+            author=rng.choice(users),
+            name=f'{PREFIX} рецепт {index:05d}',
+            text=' '.join(
+                ingredient.name
+                for ingredient in sample(rng, ingredients, 3)
+            ),
+            image=f'recipes/{PREFIX}.png',
+            cooking_time=rng.randint(1, 120),
+        ) for index in range(recipes)),
+        name__startswith=PREFIX
+    )
+    Recipe.tags.through.objects.bulk_create(
+        Recipe.tags.through(recipe_id=recipe.id, tag_id=tag.id)
+        for recipe in recipes
+        for tag in sample(rng, tags, rng.randint(1, 3))
+    )
+    IngredientsInRecipe.objects.bulk_create(
+        IngredientsInRecipe(
+            recipe=recipe, ingredient=ingredient, amount=rng.randint(1, 500)
+        )
+        for recipe in recipes
+        for ingredient in sample(rng, ingredients, ingredients_per_recipe)
+    )
+    Follow.objects.bulk_create(
+        Follow(user=user, author=author)
+        for user in users
+        for author in sample(
+            rng, [other for other in users if other != user], follows
+        )
+    )
+    for model, size in ((Favorites, favorites), (ShoppingCart, carts)):
+        model.objects.bulk_create(
+            model(user=user, recipe=recipe)
+            for user in users
+            for recipe in sample(rng, recipes, size)
+        )
+    reconcile_all()
+    for user_id, author_id in Follow.objects.filter(
+        user__in=users
+    ).values_list('user_id', 'author_id'):
+        backfill_timeline(user_id, author_id)
+    return users, tags, ingredients, recipes
+
+
+def get_image():
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 64), (200, 120, 40)).save(buffer, 'PNG')
+    return 'data:image/png;base64,{}'.format(
+        base64.b64encode(buffer.getvalue()).decode()
+    )
+
+
+def get_scenarios(rng, users, tags, ingredients, recipes):
+    viewer = users[0]
+    client = APIClient()
+    client.force_authenticate(viewer)
+    own_recipe = Recipe.objects.filter(author=viewer).first() or recipes[0]
+    image = get_image()
+
+    def payload(index):
+        return {
+            'name': f'{PREFIX} новый рецепт {index}',
+            'text': f'{PREFIX} описание {index}',
+            'cooking_time': 10,
+            'image': image,
+            'tags': [tag.id for tag in sample(rng, tags, 2)],
+            'ingredients': [
+                {'id': ingredient.id, 'amount': rng.randint(1, 500)}
+                for ingredient in sample(rng, ingredients, 8)
+            ],
+        }
+
+    def recipe_list(index):
+        return client.get(reverse('recipes:recipe-list'))
+
+    def recipe_retrieve(index):
+        return client.get(reverse(
+            'recipes:recipe-detail', args=(recipes[index % len(recipes)].id,)
+        ))
+
+    def subscriptions(index):
+        return client.get(reverse('users:users-subscriptions'))
+
+    def feed(index):
+        return client.get(reverse('recipes:recipe-feed'))
+
+    def download_shopping_cart(index):
+        response = client.get(reverse('recipes:recipe-download-shopping-cart'))
+        b''.join(response.streaming_content)
+        return response
+
+    def ingredient_search(index):
+        return client.get(
+            reverse('recipes:ingredient-list'),
+            {'name': f'{PREFIX} ингредиент {index:03d}'}
+        )
+
+    def recipe_create(index):
+        return client.post(
+            reverse('recipes:recipe-list'), payload(index), format='json'
+        )
+
+    def recipe_update(index):
+        data = payload(index)
+        del data['image']
+        return client.patch(
+            reverse('recipes:recipe-detail', args=(own_recipe.id,)),
+            data, format='json'
+        )
+
+    return {
+        'recipe_list': recipe_list,
+        'recipe_retrieve': recipe_retrieve,
+        'subscriptions': subscriptions,
+        'feed': feed,
+        'download_shopping_cart': download_shopping_cart,
+        'ingredient_search': ingredient_search,
+        'recipe_create': recipe_create,
+        'recipe_update': recipe_update,
+    }
+
+
+def measure(scenario, repeat):
+    scenario(0)
+    timings = []
+    for index in range(1, repeat + 1):
+        started = perf_counter()
+        response = scenario(index)
+        timings.append(perf_counter() - started)
+        if response.status_code >= 400:
+            raise RuntimeError(
+                f'{response.status_code}: {getattr(response, "data", "")}'
+            )
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            scenario(repeat + 1)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'median_ms': round(statistics.median(timings) * 1000, 2),
+        'max_ms': round(max(timings) * 1000, 2),
+        'peak_kib': round(peak / 1024, 1),
+        'queries': len(queries),
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result['queries'] > expected['queries']:
+            regressions.append(
+                f'{name}: запросов {result["queries"]} '
+                f'> {expected["queries"]}'
+            )
+        for metric, noise in NOISE.items():
+            limit = expected[metric] * (1 + tolerance) + noise
+            if result[metric] > limit:
+                regressions.append(
+                    f'{name}: {metric} {result[metric]} > {limit:.2f}'
+                )
+    return regressions
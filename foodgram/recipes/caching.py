@@ -0,0 +1,119 @@
+import hashlib
+import json
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from .constants import RESPONSE_CACHE_TIMEOUT, VERSION_CACHE_TIMEOUT
+from .models import CacheVersion, Tag
+
+
+tag_slug_maps = {}
+
+
+def get_version_key(model):
+    return f'version:{model._meta.label_lower}'
+
+
+def read_versions(keys):
+    return CacheVersion.objects.filter(key__in=keys).values_list(
+        'key', 'version'
+    )
+
+
+def get_versions(*models):
+    keys = [get_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        versions.update(read_versions(missing))
+        absent = [key for key in missing if key not in versions]
+        if absent:
+            CacheVersion.objects.bulk_create(
+                (CacheVersion(key=key, version=uuid4().hex) for key in absent),
+                ignore_conflicts=True
+            )
+            versions.update(read_versions(absent))
+        cache.set_many(
+            {key: versions[key] for key in missing}, VERSION_CACHE_TIMEOUT
+        )
+    return [versions[key] for key in keys]
+
+
+def get_version(model):
+    return get_versions(model)[0]
+
+
+def bump_version(model):
+    key = get_version_key(model)
+    version = uuid4().hex
+    CacheVersion.objects.update_or_create(
+        key=key, defaults={'version': version}
+    )
+    transaction.on_commit(
+        lambda: cache.set(key, version, VERSION_CACHE_TIMEOUT)
+    )
+
+
+def get_tag_slug_map():
+    version = get_version(Tag)
+    slug_map = tag_slug_maps.get(version)
+    if slug_map is None:
+        slug_map = dict(Tag.objects.values_list('slug', 'id'))
+        tag_slug_maps.clear()
+        tag_slug_maps[version] = slug_map
+    return slug_map
+
+
+def get_tag_choices():
+    return [(slug, slug) for slug in get_tag_slug_map()]
+
+
+def make_etag(data):
+    content = json.dumps(data, ensure_ascii=False, sort_keys=True)
+    return '"{}"'.format(hashlib.sha1(content.encode()).hexdigest())
+
+
+def etag_matches(request, etag):
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(',')]
+    return '*' in tags or etag in tags
+
+
+class CachedResponseMixin:
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        model = self.get_queryset().model
+        key = 'response:{}:{}:{}'.format(
+            model._meta.label_lower,
+            get_version(model),
+            request.get_full_path()
+        )
+        cached = cache.get(key)
+        if cached is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cached = (make_etag(response.data), response.data)
+            cache.set(key, cached, RESPONSE_CACHE_TIMEOUT)
+        etag, data = cached
+        if etag_matches(request, etag):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag}
+            )
+        return Response(data, headers={'ETag': etag})
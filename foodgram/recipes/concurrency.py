@@ -0,0 +1,48 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.urls import URLPattern
+
+
+ASYNC_METHODS = ('GET', 'HEAD')
+
+
+def database_sync_to_async(func):
+    @wraps(func)
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+def render_view(view, request, *args, **kwargs):
+    response = view(request, *args, **kwargs)
+    if callable(getattr(response, 'render', None)):
+        response.render()
+    return response
+
+
+def async_view(view):
+    @wraps(view)
+    async def wrapped(request, *args, **kwargs):
+        if request.method in ASYNC_METHODS:
+            return await database_sync_to_async(render_view)(
+                view, request, *args, **kwargs
+            )
+        return await sync_to_async(render_view)(
+            view, request, *args, **kwargs
+        )
+    return wrapped
+
+
+def async_urls(urls, names):
+    return [
+        URLPattern(
+            url.pattern, async_view(url.callback), url.default_args, url.name
+        ) if url.name in names else url
+        for url in urls
+    ]
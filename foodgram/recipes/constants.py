@@ -10,5 +10,44 @@ MAX_AMOUNT = 1000
 PAGE_SIZE_RECIPE = 6
 MAX_PAGE_SIZE_RECIPE = 100
 RECIPES_DEFAULT = 3
+"""Loading"""
+INGREDIENTS_BATCH_SIZE = 1000
+"""Search"""
+INGREDIENT_SEARCH_LIMIT = 50
+"""Shopping list"""
+SHOPPING_LIST_CHUNK_SIZE = 2000
+"""Cache"""
+MEMBERSHIP_CACHE_TIMEOUT = 60 * 60 * 24
+RESPONSE_CACHE_TIMEOUT = 60 * 60 * 24
+VERSION_CACHE_TIMEOUT = 5
+"""Images"""
+IMAGE_MAX_SIZE = 10 * 1024 * 1024
+IMAGE_MAX_PIXELS = 40_000_000
+UPLOAD_OVERHEAD = 64 * 1024
+IMAGE_UPLOAD_FORMATS = ('JPEG', 'PNG', 'WEBP')
+IMAGE_SOURCE_FORMATS = (*IMAGE_UPLOAD_FORMATS, 'GIF')
+IMAGE_WORKERS = 2
+IMAGE_RENDITIONS = {
+    'thumbnail': (480, 480),
+    'detail': (1200, 1200),
+}
+IMAGE_FORMATS = {
+    'webp': 'WEBP',
+    'jpg': 'JPEG',
+}
+"""Batch"""
+RECIPE_BATCH_LIMIT = 100
+"""Popularity"""
+FAVORITE_WEIGHT = 2
+SHOPPING_CART_WEIGHT = 1
+POPULAR_HALF_LIFE = 60 * 60 * 24 * 30
+TRENDING_HALF_LIFE = 60 * 60 * 24
+POPULARITY_BATCH_SIZE = 5000
+"""Feed"""
+FEED_FANOUT_LIMIT = 1000
+FEED_BACKFILL_LIMIT = 100
+FEED_BATCH_SIZE = 1000
+"""Admin"""
+ADMIN_COUNT_LIMIT = 10000
 """Users"""
 USER_MAX_LEN = 150
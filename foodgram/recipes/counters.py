@@ -0,0 +1,48 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from users.models import Follow, User
+from .models import Favorites, Recipe, ShoppingCart
+
+
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorites, 'recipe'),
+    (Recipe, 'shopping_cart_count', ShoppingCart, 'recipe'),
+    (User, 'recipes_count', Recipe, 'author'),
+    (User, 'followers_count', Follow, 'author'),
+)
+
+
+def change_counter(model, pk, field, delta):
+    change_counters(model, (pk,), field, delta)
+
+
+def change_counters(model, pks, field, delta):
+    queryset = model.objects.filter(pk__in=pks)
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def count_related(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(
+            **{field: OuterRef('pk')}
+        ).order_by().values(field).annotate(
+            count=Count('pk')
+        ).values('count')
+    ), 0)
+
+
+def reconcile(model, field, related_model, related_field):
+    actual = count_related(related_model, related_field)
+    return model.objects.exclude(**{field: actual}).update(**{field: actual})
+
+
+def reconcile_all():
+    return {
+        f'{model._meta.label}.{field}': reconcile(
+            model, field, related_model, related_field
+        )
+        for model, field, related_model, related_field in COUNTERS
+    }
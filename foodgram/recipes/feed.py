@@ -0,0 +1,91 @@
+from django.db.models import Q
+
+from users.models import Follow, User
+from .constants import (
+    FEED_BACKFILL_LIMIT, FEED_BATCH_SIZE, FEED_FANOUT_LIMIT
+)
+from .models import Recipe, TimelineEntry
+
+
+def is_popular(author_id):
+    return User.objects.filter(
+        pk=author_id, followers_count__gt=FEED_FANOUT_LIMIT
+    ).exists()
+
+
+def fan_out_recipe(recipe):
+    if is_popular(recipe.author_id):
+        return
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(
+                user_id=user_id,
+                recipe_id=recipe.id,
+                author_id=recipe.author_id,
+                created=recipe.created,
+            ) for user_id in Follow.objects.filter(
+                author_id=recipe.author_id
+            ).values_list('user_id', flat=True).iterator()
+        ),
+        batch_size=FEED_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def backfill_timeline(user_id, author_id):
+    if is_popular(author_id):
+        return
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(
+                user_id=user_id,
+                recipe_id=recipe_id,
+                author_id=author_id,
+                created=created,
+            ) for recipe_id, created in Recipe.objects.filter(
+                author_id=author_id
+            ).order_by('-created', '-id').values_list(
+                'id', 'created'
+            )[:FEED_BACKFILL_LIMIT]
+        ),
+        ignore_conflicts=True
+    )
+
+
+def trim_timeline(user_id, author_id):
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def get_keyset_filter(position, field):
+    if position is None:
+        return Q()
+    created, pk = position
+    return Q(created__lte=created) & (
+        Q(created__lt=created) | Q(created=created, **{f'{field}__lt': pk})
+    )
+
+
+def get_feed_page(user, position, limit):
+    rows = set(TimelineEntry.objects.filter(
+        get_keyset_filter(position, 'recipe_id'), user=user
+    ).order_by('-created', '-recipe_id').values_list(
+        'created', 'recipe_id'
+    )[:limit + 1])
+    popular_authors = list(Follow.objects.filter(
+        user=user, author__followers_count__gt=FEED_FANOUT_LIMIT
+    ).values_list('author_id', flat=True))
+    if popular_authors:
+        rows.update(Recipe.objects.filter(
+            get_keyset_filter(position, 'id'), author_id__in=popular_authors
+        ).order_by('-created', '-id').values_list(
+            'created', 'id'
+        )[:limit + 1])
+    rows = sorted(rows, reverse=True)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    recipes = Recipe.objects.with_related().in_bulk(
+        [recipe_id for _, recipe_id in rows]
+    )
+    return [
+        recipes[recipe_id] for _, recipe_id in rows if recipe_id in recipes
+    ], rows, has_more
@@ -0,0 +1,31 @@
+from rest_framework import serializers
+
+
+class RenditionField(serializers.Field):
+
+    def __init__(self, rendition=None, image_format='jpg', **kwargs):
+        self.rendition = rendition
+        self.image_format = image_format
+        kwargs['read_only'] = True
+        kwargs.setdefault('source', '*')
+        super().__init__(**kwargs)
+
+    def get_rendition(self):
+        if self.rendition:
+            return self.rendition
+        view = self.context.get('view')
+        if view is not None and view.action in ('list', 'trending', 'feed'):
+            return 'thumbnail'
+        return 'detail'
+
+    def to_representation(self, recipe):
+        if not recipe.image:
+            return None
+        name = recipe.image_renditions.get(
+            self.get_rendition(), {}
+        ).get(self.image_format)
+        url = recipe.image.storage.url(name) if name else recipe.image.url
+        request = self.context.get('request')
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
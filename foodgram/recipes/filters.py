@@ -1,44 +1,62 @@
 from django.contrib.auth import get_user_model
+from django.db.models import F
 from django_filters.rest_framework import FilterSet, filters
 
-from recipes.models import Ingredient, Recipe, Tag
+from recipes.caching import get_tag_choices, get_tag_slug_map
+from recipes.fulltext import search_recipes
+from recipes.models import Recipe
 
 
 User = get_user_model()
 
 
-class IngredientFilter(FilterSet):
-    name = filters.CharFilter(lookup_expr='startswith')
-
-    class Meta:
-        model = Ingredient
-        fields = ['name', ]
-
-
 class FilterForRecipes(FilterSet):
 
-    tags = filters.ModelMultipleChoiceFilter(
-        field_name='tags__slug',
-        to_field_name='slug',
-        queryset=Tag.objects.all(),
+    tags = filters.MultipleChoiceFilter(
+        choices=get_tag_choices, method='filter_tags'
     )
+    search = filters.CharFilter(method='filter_search')
     is_favorited = filters.BooleanFilter(method='filter_is_favorited')
     is_in_shopping_cart = filters.BooleanFilter(
         method='filter_is_in_shopping_cart'
     )
+    ordering = filters.ChoiceFilter(
+        choices=(('popular', 'popular'),), method='filter_ordering'
+    )
 
     class Meta:
         model = Recipe
         fields = ('tags', 'author',)
 
+    def filter_tags(self, queryset, name, value):
+        if not value:
+            return queryset
+        slug_map = get_tag_slug_map()
+        return queryset.filter(pk__in=Recipe.tags.through.objects.filter(
+            tag_id__in=[slug_map[slug] for slug in value]
+        ).values('recipe_id'))
+
+    def filter_search(self, queryset, name, value):
+        return search_recipes(queryset, value)
+
     def filter_is_favorited(self, queryset, name, value):
         user = self.request.user
+        if value and not user.is_authenticated:
+            return queryset.none()
         if value:
             return queryset.filter(favorites_recipe__user=user)
         return queryset
 
     def filter_is_in_shopping_cart(self, queryset, name, value):
         user = self.request.user
+        if value and not user.is_authenticated:
+            return queryset.none()
         if value:
             return queryset.filter(shopping_cart_recipe__user=user)
         return queryset
+
+    def filter_ordering(self, queryset, name, value):
+        return queryset.order_by(
+            F('popularity__popular_score').desc(nulls_last=True),
+            'name', 'id'
+        )
@@ -0,0 +1,88 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection, connections
+from django.db.models import F
+from django.db.models.expressions import RawSQL
+
+
+FTS_TABLE = 'recipes_recipe_fts'
+
+SQLITE_TRIGGERS = {
+    'recipes_recipe_fts_insert': f"""
+        CREATE TRIGGER IF NOT EXISTS recipes_recipe_fts_insert
+        AFTER INSERT ON recipes_recipe
+        BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, name, text)
+            VALUES (new.id, new.name, new.text);
+        END;
+    """,
+    'recipes_recipe_fts_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS recipes_recipe_fts_delete
+        AFTER DELETE ON recipes_recipe
+        BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, text)
+            VALUES ('delete', old.id, old.name, old.text);
+        END;
+    """,
+    'recipes_recipe_fts_update': f"""
+        CREATE TRIGGER IF NOT EXISTS recipes_recipe_fts_update
+        AFTER UPDATE OF name, text ON recipes_recipe
+        BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, text)
+            VALUES ('delete', old.id, old.name, old.text);
+            INSERT INTO {FTS_TABLE}(rowid, name, text)
+            VALUES (new.id, new.name, new.text);
+        END;
+    """,
+}
+
+
+def get_fts5_query(query):
+    return ' '.join(
+        '"{}"*'.format(term.replace('"', '""')) for term in query.split()
+    )
+
+
+def search_recipes(queryset, query):
+    query = query.strip()
+    if not query:
+        return queryset
+    if connection.vendor == 'postgresql':
+        search_query = SearchQuery(
+            query, config='russian', search_type='websearch'
+        )
+        return queryset.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F('search_vector'), search_query)
+        ).order_by('-rank', 'name', 'id')
+    if connection.vendor == 'sqlite':
+        fts_query = get_fts5_query(query)
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            (fts_query,)
+        )).annotate(rank=RawSQL(
+            f'SELECT -bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = recipes_recipe.id',
+            (fts_query,)
+        )).order_by('-rank', 'name', 'id')
+    return queryset.filter(name__icontains=query)
+
+
+def install_sqlite_triggers(using):
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT type, name FROM sqlite_master WHERE name = %s '
+            'OR (type = %s AND tbl_name = %s)',
+            (FTS_TABLE, 'trigger', 'recipes_recipe')
+        )
+        existing = {name for _, name in cursor.fetchall()}
+        if FTS_TABLE not in existing:
+            return
+        missing = [name for name in SQLITE_TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(SQLITE_TRIGGERS[name])
+        if missing:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+            )
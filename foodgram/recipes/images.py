@@ -0,0 +1,118 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from uuid import uuid4
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image
+from rest_framework.serializers import ValidationError
+
+from .constants import (
+    IMAGE_FORMATS, IMAGE_MAX_PIXELS, IMAGE_MAX_SIZE, IMAGE_RENDITIONS,
+    IMAGE_SOURCE_FORMATS, IMAGE_UPLOAD_FORMATS, IMAGE_WORKERS
+)
+from .models import Recipe
+
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(
+    max_workers=IMAGE_WORKERS, thread_name_prefix='recipe-images'
+)
+
+
+class LimitedUploadHandler(TemporaryFileUploadHandler):
+
+    def __init__(self, request=None, max_size=IMAGE_MAX_SIZE):
+        super().__init__(request)
+        self.max_size = max_size
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.max_size:
+            raise ValidationError(
+                {'image': ['Файл слишком большой.']}
+            )
+        return super().receive_data_chunk(raw_data, start)
+
+
+def validate_upload(upload):
+    try:
+        with Image.open(upload, formats=IMAGE_UPLOAD_FORMATS) as image:
+            width, height = image.size
+            image_format = image.format
+    except (OSError, Image.DecompressionBombError):
+        raise ValidationError(
+            {'image': ['Загрузите корректное изображение.']}
+        )
+    if width * height > IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            {'image': ['Слишком большое разрешение изображения.']}
+        )
+    upload.seek(0)
+    return f'{uuid4()}.{image_format.lower()}'
+
+
+def get_rendition_paths(renditions):
+    return [
+        path for formats in renditions.values() for path in formats.values()
+    ]
+
+
+def delete_files(paths):
+    for path in paths:
+        try:
+            default_storage.delete(path)
+        except OSError:
+            logger.exception('Не удалось удалить файл %s', path)
+
+
+def discard_image(name, renditions):
+    def delete():
+        paths = get_rendition_paths(renditions)
+        if name and not Recipe.objects.filter(image=name).exists():
+            paths.append(name)
+        delete_files(paths)
+    transaction.on_commit(delete)
+
+
+def render(image, size, image_format):
+    rendition = image.copy()
+    rendition.thumbnail(size)
+    content = BytesIO()
+    rendition.save(content, image_format, quality=85)
+    return ContentFile(content.getvalue())
+
+
+def process_image(recipe_id, name):
+    try:
+        with default_storage.open(name) as file:
+            image = Image.open(file, formats=IMAGE_SOURCE_FORMATS)
+            image = image.convert('RGB')
+        renditions = {}
+        for rendition, size in IMAGE_RENDITIONS.items():
+            renditions[rendition] = {}
+            for extension, image_format in IMAGE_FORMATS.items():
+                path = default_storage.save(
+                    f'recipes/renditions/{recipe_id}_{rendition}.{extension}',
+                    render(image, size, image_format)
+                )
+                renditions[rendition][extension] = path
+        if not Recipe.objects.filter(pk=recipe_id, image=name).update(
+            image_renditions=renditions, updated=timezone.now()
+        ):
+            delete_files(get_rendition_paths(renditions))
+    except Exception:
+        logger.exception('Не удалось обработать изображение %s', name)
+    finally:
+        connections.close_all()
+
+
+def schedule_renditions(recipe):
+    recipe_id, name = recipe.pk, recipe.image.name
+    transaction.on_commit(
+        lambda: executor.submit(process_image, recipe_id, name)
+    )
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import logging
+import re
+from collections import Counter
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+current_metrics = ContextVar('current_metrics', default=None)
+
+PLACEHOLDERS = re.compile(r'%s(?:, %s)+')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += perf_counter() - started
+            self.queries += 1
+            self.shapes[PLACEHOLDERS.sub('%s', sql)] += 1
+
+    @property
+    def duplicates(self):
+        return sum(count - 1 for count in self.shapes.values() if count > 1)
+
+    def get_duplicate_shapes(self):
+        return [shape for shape, count in self.shapes.items() if count > 1]
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+class TimedSerializerMixin:
+
+    def to_representation(self, instance):
+        metrics = current_metrics.get()
+        if metrics is None or metrics.serializing:
+            return super().to_representation(instance)
+        metrics.serializing = True
+        started = perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serializing = False
+            metrics.serializer_time += perf_counter() - started
+
+
+def get_view_name(view_func, method):
+    cls = getattr(view_func, 'cls', None)
+    if cls is None:
+        return getattr(view_func, '__name__', None)
+    action = getattr(view_func, 'actions', {}).get(method.lower())
+    if action is None:
+        return cls.__name__
+    return f'{cls.__name__}.{action}'
+
+
+def get_budget(view_name):
+    if view_name is None:
+        return None
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    budget = budgets.get(view_name)
+    if budget is None:
+        budget = budgets.get(view_name.split('.')[0])
+    return budget
+
+
+class QueryInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not request.path.startswith('/api/'):
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        if not request.path.startswith('/api/'):
+            return await self.get_response(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    def finish(self, request, response, metrics, started):
+        response['Server-Timing'] = ', '.join((
+            f'total;dur={(perf_counter() - started) * 1000:.1f}',
+            f'sql;dur={metrics.sql_time * 1000:.1f};'
+            f'desc="{metrics.queries} queries, '
+            f'{metrics.duplicates} duplicates"',
+            f'serializer;dur={metrics.serializer_time * 1000:.1f}',
+        ))
+        if response.streaming:
+            response.streaming_content = self.stream(
+                request, response, metrics, started,
+                response.streaming_content
+            )
+        else:
+            self.report(request, response, metrics, started)
+        return response
+
+    def stream(self, request, response, metrics, started, content):
+        chunks = iter(content)
+        while True:
+            token = current_metrics.set(metrics)
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                break
+            finally:
+                current_metrics.reset(token)
+            yield chunk
+        self.report(request, response, metrics, started)
+
+    def report(self, request, response, metrics, started):
+        total = perf_counter() - started
+        view_name = getattr(request, 'instrumented_view', None)
+        logger.debug(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': view_name,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'sql_ms': round(metrics.sql_time * 1000, 2),
+            'queries': metrics.queries,
+            'duplicates': metrics.duplicates,
+            'serializer_ms': round(metrics.serializer_time * 1000, 2),
+        }, ensure_ascii=False))
+        self.check_budget(view_name, metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.instrumented_view = get_view_name(view_func, request.method)
+
+    def check_budget(self, view_name, metrics):
+        budget = get_budget(view_name)
+        if budget is None:
+            return
+        overruns = []
+        if metrics.queries > budget.get('queries', metrics.queries):
+            overruns.append(
+                f'{metrics.queries} queries > {budget["queries"]}'
+            )
+        if metrics.duplicates > budget.get('duplicates', metrics.duplicates):
+            overruns.append(
+                f'{metrics.duplicates} duplicates > {budget["duplicates"]}: '
+                + '; '.join(metrics.get_duplicate_shapes())
+            )
+        if not overruns:
+            return
+        message = f'{view_name} exceeded query budget: ' + ', '.join(overruns)
+        if getattr(settings, 'QUERY_BUDGET_RAISE', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
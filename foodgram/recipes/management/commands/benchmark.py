@@ -0,0 +1,106 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from recipes.benchmark import compare, generate, get_scenarios, measure
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the hot API endpoints on a generated dataset; '
+        'all generated data is rolled back'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--recipes', type=int, default=500)
+        parser.add_argument('--ingredients', type=int, default=1000)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument('--follows', type=int, default=10)
+        parser.add_argument('--favorites', type=int, default=20)
+        parser.add_argument('--carts', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--only', nargs='*', default=None)
+        parser.add_argument('--baseline', default='benchmark_baseline.json')
+        parser.add_argument('--save-baseline', action='store_true')
+        parser.add_argument('--tolerance', type=float, default=0.5)
+
+    def handle(self, *args, **options):
+        if options['users'] < 2 or options['recipes'] < 1:
+            raise CommandError('Нужно минимум 2 пользователя и 1 рецепт.')
+        media_root = tempfile.mkdtemp(prefix='benchmark-')
+        try:
+            with override_settings(
+                CACHES={'default': {
+                    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                    'LOCATION': 'benchmark',
+                }},
+                MEDIA_ROOT=media_root,
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            ):
+                results = self.run(options)
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+        self.report(results)
+        if options['save_baseline']:
+            with open(options['baseline'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, indent=4, sort_keys=True)
+            self.stdout.write(
+                f'Базовая линия сохранена: {options["baseline"]}'
+            )
+            return
+        if not os.path.exists(options['baseline']):
+            self.stdout.write('Базовая линия не найдена, сравнение пропущено.')
+            return
+        with open(options['baseline'], encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, options['tolerance'])
+        if regressions:
+            raise CommandError(
+                'Обнаружены регрессии:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий не обнаружено.'))
+
+    def run(self, options):
+        rng = random.Random(options['seed'])
+        results = {}
+        with transaction.atomic():
+            dataset = generate(
+                rng,
+                users=options['users'],
+                recipes=options['recipes'],
+                ingredients=options['ingredients'],
+                ingredients_per_recipe=options['ingredients_per_recipe'],
+                follows=options['follows'],
+                favorites=options['favorites'],
+                carts=options['carts'],
+            )
+            scenarios = get_scenarios(rng, *dataset)
+            for name, scenario in scenarios.items():
+                if options['only'] and name not in options['only']:
+                    continue
+                try:
+                    results[name] = measure(scenario, options['repeat'])
+                except RuntimeError as error:
+                    raise CommandError(f'{name}: {error}')
+            transaction.set_rollback(True)
+        return results
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"endpoint":<24}{"median, ms":>12}{"max, ms":>12}'
+            f'{"peak, KiB":>12}{"queries":>10}'
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<24}{result["median_ms"]:>12}{result["max_ms"]:>12}'
+                f'{result["peak_kib"]:>12}{result["queries"]:>10}'
+            )
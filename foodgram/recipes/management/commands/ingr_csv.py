@@ -1,26 +1,96 @@
 import csv
+import json
 import os
+from itertools import islice
+from time import perf_counter
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
+from recipes.caching import bump_version
+from recipes.constants import INGREDIENTS_BATCH_SIZE
 from recipes.models import Ingredient
 
 
+CHUNK_SIZE = 64 * 1024
+
+
+def read_csv(file):
+    for row in csv.reader(file):
+        if not row or row == ['name', 'measurement_unit']:
+            continue
+        yield row[0], row[1]
+
+
+def read_json(file):
+    decoder = json.JSONDecoder()
+    buffer = file.read(CHUNK_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise CommandError('Ожидается JSON-массив ингредиентов.')
+    buffer = buffer[1:]
+    eof = False
+    while True:
+        buffer = buffer.lstrip()
+        if buffer.startswith(','):
+            buffer = buffer[1:].lstrip()
+        if buffer.startswith(']'):
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise CommandError('Некорректный JSON-файл.')
+            chunk = file.read(CHUNK_SIZE)
+            eof = not chunk
+            buffer += chunk
+            continue
+        yield item['name'], item['measurement_unit']
+        buffer = buffer[end:]
+
+
+READERS = {
+    '.csv': read_csv,
+    '.json': read_json,
+}
+
+
 class Command(BaseCommand):
-    help = 'Load ingredients from a CSV file'
+    help = 'Load ingredients from a CSV or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?',
+            default=os.path.join('recipes', 'management', 'ingredients.csv')
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=INGREDIENTS_BATCH_SIZE
+        )
 
     def handle(self, *args, **options):
-        file_name = 'ingredients.csv'
-        file_path = os.path.join('recipes', 'management', file_name)
-        with open(file_path, 'r', encoding='utf-8') as csvfile:
-            csvreader = csv.reader(csvfile)
-            next(csvreader)
-            for row in csvreader:
-                name = row[0]
-                measurement_unit = row[1]
-                ingredient = Ingredient(
-                    name=name, measurement_unit=measurement_unit
-                )
-                ingredient.save()
-
-        self.stdout.write(self.style.SUCCESS('Ингредиенты загружены!'))
+        file_path = options['path']
+        reader = READERS.get(os.path.splitext(file_path)[1].lower())
+        if reader is None:
+            raise CommandError('Поддерживаются только файлы .csv и .json.')
+        before = Ingredient.objects.count()
+        processed = 0
+        started = perf_counter()
+        with open(file_path, 'r', encoding='utf-8') as file:
+            rows = reader(file)
+            while True:
+                batch = [
+                    Ingredient(name=name, measurement_unit=measurement_unit)
+                    for name, measurement_unit in islice(
+                        rows, options['batch_size']
+                    )
+                ]
+                if not batch:
+                    break
+                Ingredient.objects.bulk_create(batch, ignore_conflicts=True)
+                processed += len(batch)
+        elapsed = perf_counter() - started
+        bump_version(Ingredient)
+        created = Ingredient.objects.count() - before
+        self.stdout.write(self.style.SUCCESS(
+            f'Ингредиенты загружены! Обработано: {processed}, '
+            f'добавлено: {created}, '
+            f'{processed / elapsed if elapsed else processed:.0f} строк/с'
+        ))
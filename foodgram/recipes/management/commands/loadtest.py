@@ -0,0 +1,151 @@
+import os
+import statistics
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter, sleep
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+PATHS = (
+    '/api/recipes/',
+    '/api/recipes/?cursor=',
+    '/api/tags/',
+    '/api/ingredients/?name=а',
+)
+AUTH_PATHS = (
+    '/api/users/subscriptions/',
+)
+STARTUP_TIMEOUT = 30
+LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+def get_server_command(server, port, workers):
+    if server == 'gunicorn':
+        return [
+            sys.executable, '-m', 'gunicorn', 'foodgram.wsgi:application',
+            '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+        ], {'ASYNC_VIEWS': 'False'}
+    return [
+        sys.executable, '-m', 'uvicorn', 'foodgram.asgi:application',
+        '--host', '127.0.0.1', '--port', str(port),
+        '--workers', str(workers), '--no-access-log',
+    ], {'ASYNC_VIEWS': 'True'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare concurrent throughput of the read endpoints under '
+        'gunicorn (WSGI) and uvicorn (ASGI with async views)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--servers', nargs='+', choices=('gunicorn', 'uvicorn'),
+            default=['gunicorn', 'uvicorn']
+        )
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument('--port', type=int, default=8100)
+        parser.add_argument('--token', default=None)
+        parser.add_argument('--paths', nargs='+', default=None)
+
+    def handle(self, *args, **options):
+        if (
+            options['workers'] > 1
+            and settings.CACHES['default']['BACKEND'] in LOCAL_CACHES
+        ):
+            raise CommandError(
+                'Несколько воркеров требуют общего кэша: '
+                'задайте CACHE_BACKEND и CACHE_LOCATION.'
+            )
+        paths = options['paths'] or [
+            *PATHS, *(AUTH_PATHS if options['token'] else ())
+        ]
+        headers = {}
+        if options['token']:
+            headers['Authorization'] = f'Token {options["token"]}'
+        bodies = {}
+        port = options['port']
+        for server in options['servers']:
+            command, env = get_server_command(
+                server, port, options['workers']
+            )
+            process = subprocess.Popen(
+                command, cwd=settings.BASE_DIR,
+                env={**os.environ, **env},
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                base_url = f'http://127.0.0.1:{port}'
+                self.wait_ready(base_url, process)
+                bodies[server] = {
+                    path: requests.get(base_url + path, headers=headers).json()
+                    for path in paths
+                }
+                self.report(
+                    server, self.run(base_url, paths, headers, options)
+                )
+            finally:
+                process.terminate()
+                process.wait()
+        self.compare(bodies)
+
+    def wait_ready(self, base_url, process):
+        deadline = perf_counter() + STARTUP_TIMEOUT
+        while perf_counter() < deadline:
+            if process.poll() is not None:
+                raise CommandError('Сервер завершился при запуске.')
+            try:
+                requests.get(base_url + PATHS[0], timeout=5)
+                return
+            except requests.RequestException:
+                sleep(0.2)
+        raise CommandError('Сервер не запустился.')
+
+    def run(self, base_url, paths, headers, options):
+        local = threading.local()
+
+        def fetch(index):
+            session = getattr(local, 'session', None)
+            if session is None:
+                session = local.session = requests.Session()
+            started = perf_counter()
+            response = session.get(
+                base_url + paths[index % len(paths)], headers=headers
+            )
+            return perf_counter() - started, response.status_code
+
+        started = perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            results = list(executor.map(fetch, range(options['requests'])))
+        elapsed = perf_counter() - started
+        latencies = sorted(latency for latency, _ in results)
+        return {
+            'rps': len(results) / elapsed,
+            'p50': statistics.median(latencies) * 1000,
+            'p95': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+            'errors': sum(1 for _, status in results if status >= 400),
+        }
+
+    def report(self, server, result):
+        self.stdout.write(
+            f'{server:<10}{result["rps"]:>10.1f} req/s'
+            f'{result["p50"]:>10.1f} ms p50{result["p95"]:>10.1f} ms p95'
+            f'{result["errors"]:>6} errors'
+        )
+
+    def compare(self, bodies):
+        servers = list(bodies)
+        for server in servers[1:]:
+            for path, body in bodies[server].items():
+                if body != bodies[servers[0]][path]:
+                    self.stdout.write(self.style.WARNING(
+                        f'{path}: ответ {server} отличается '
+                        f'от {servers[0]}'
+                    ))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from recipes.counters import reconcile_all
+
+
+class Command(BaseCommand):
+    help = 'Recalculate denormalized counters that drifted from the data'
+
+    def handle(self, *args, **options):
+        for counter, fixed in reconcile_all().items():
+            self.stdout.write(f'{counter}: исправлено строк {fixed}')
+        self.stdout.write(self.style.SUCCESS('Счётчики сверены!'))
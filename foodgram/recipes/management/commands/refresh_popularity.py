@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from recipes.constants import POPULARITY_BATCH_SIZE
+from recipes.popularity import rebuild_popularity, refresh_popularity
+
+
+class Command(BaseCommand):
+    help = 'Fold new favorites and cart rows into recipe popularity scores'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=POPULARITY_BATCH_SIZE
+        )
+        parser.add_argument('--rebuild', action='store_true')
+
+    def handle(self, *args, **options):
+        refresh = rebuild_popularity if options['rebuild'] else (
+            refresh_popularity
+        )
+        processed = refresh(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Популярность обновлена! Обработано строк: {processed}'
+        ))
@@ -0,0 +1,61 @@
+from array import array
+
+from django.core.cache import cache
+from django.db import transaction
+
+from users.models import Follow
+from .constants import MEMBERSHIP_CACHE_TIMEOUT
+from .models import Favorites, ShoppingCart
+
+
+FAVORITES = 'favorites'
+SHOPPING_CART = 'shopping_cart'
+FOLLOWS = 'follows'
+
+SOURCES = {
+    FAVORITES: (Favorites, 'recipe_id'),
+    SHOPPING_CART: (ShoppingCart, 'recipe_id'),
+    FOLLOWS: (Follow, 'author_id'),
+}
+
+
+def get_cache_key(kind, user_id):
+    return f'membership:{kind}:{user_id}'
+
+
+def pack(ids):
+    return array('q', sorted(ids)).tobytes()
+
+
+def unpack(data):
+    ids = array('q')
+    ids.frombytes(data)
+    return set(ids)
+
+
+def get_ids(kind, user_id):
+    key = get_cache_key(kind, user_id)
+    data = cache.get(key)
+    if data is not None:
+        return unpack(data)
+    model, field = SOURCES[kind]
+    ids = set(
+        model.objects.filter(user_id=user_id).values_list(field, flat=True)
+    )
+    cache.set(key, pack(ids), MEMBERSHIP_CACHE_TIMEOUT)
+    return ids
+
+
+def invalidate_ids(kind, user_id):
+    key = get_cache_key(kind, user_id)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def is_member(context, kind, pk):
+    request = context.get('request')
+    if not request or not request.user.is_authenticated:
+        return False
+    memo = context.setdefault('membership', {})
+    if kind not in memo:
+        memo[kind] = get_ids(kind, request.user.id)
+    return pk in memo[kind]
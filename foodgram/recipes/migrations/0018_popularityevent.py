@@ -0,0 +1,31 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0017_cacheversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PopularityEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=200)),
+                ('created', models.DateTimeField()),
+                ('removed', models.BooleanField(default=False)),
+                ('recipe', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='recipes.recipe')),
+            ],
+            options={
+                'verbose_name': 'Событие популярности',
+                'verbose_name_plural': 'События популярности',
+            },
+        ),
+        migrations.DeleteModel(
+            name='PopularityWatermark',
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.16 on 2026-10-18 21:00
+
+from uuid import uuid4
+
+from django.db import migrations
+
+
+KEYS = ('version:recipes.tag', 'version:recipes.ingredient')
+
+
+def seed_versions(apps, schema_editor):
+    CacheVersion = apps.get_model('recipes', 'CacheVersion')
+    CacheVersion.objects.bulk_create(
+        (CacheVersion(key=key, version=uuid4().hex) for key in KEYS),
+        ignore_conflicts=True
+    )
+
+
+def remove_versions(apps, schema_editor):
+    apps.get_model('recipes', 'CacheVersion').objects.filter(
+        key__in=KEYS
+    ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0018_popularityevent'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_versions, remove_versions),
+    ]
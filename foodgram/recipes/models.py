@@ -1,6 +1,8 @@
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Prefetch
 from colorfield.fields import ColorField
 
 from .constants import (
@@ -41,10 +43,25 @@ class Tag(models.Model):
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+
+    def with_related(self):
+        return self.select_related('author').prefetch_related(
+            'tags',
+            Prefetch(
+                'recipes',
+                queryset=IngredientsInRecipe.objects.select_related(
+                    'ingredient'
+                )
+            ),
+        )
+
+
 class Recipe(models.Model):
     name = models.CharField(max_length=RECIPES_CHAR_MAX_LEN)
     text = models.TextField()
     image = models.ImageField(upload_to='recipes/', blank=True)
+    image_renditions = models.JSONField(default=dict, blank=True)
     cooking_time = models.PositiveSmallIntegerField(
         validators=[
             MinValueValidator(
@@ -63,11 +80,30 @@ class Recipe(models.Model):
         through='IngredientsInRecipe',
     )
     tags = models.ManyToManyField(Tag)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    favorites_count = models.PositiveIntegerField(default=0, editable=False)
+    shopping_cart_count = models.PositiveIntegerField(
+        default=0, editable=False
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
-        ordering = ['name', ]
+        ordering = ['name', 'id']
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [
+            models.Index(fields=['name', 'id'], name='recipe_name_id_idx'),
+            models.Index(
+                fields=['author', 'name', 'id'], name='recipe_author_name_idx'
+            ),
+            models.Index(
+                fields=['author', '-created', '-id'],
+                name='recipe_author_created_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -117,11 +153,15 @@ class ShoppingCart(models.Model):
         on_delete=models.CASCADE,
         related_name='shopping_cart_recipe'
     )
+    created = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         constraints = [models.UniqueConstraint(
             fields=['recipe', 'user'], name='unique_shop'
         )]
+        indexes = [models.Index(
+            fields=['user', 'recipe'], name='shopcart_user_recipe_idx'
+        )]
         verbose_name = 'Покупной лист'
         verbose_name_plural = 'Покупной лист'
 
@@ -140,13 +180,114 @@ class Favorites(models.Model):
         on_delete=models.CASCADE,
         related_name='favorites_recipe'
     )
+    created = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         constraints = [models.UniqueConstraint(
             fields=['recipe', 'user'], name='unique_favor'
         )]
+        indexes = [models.Index(
+            fields=['user', 'recipe'], name='favorites_user_recipe_idx'
+        )]
         verbose_name = 'Рецепт в избранном'
         verbose_name_plural = 'Рецепты в избранном'
 
     def __str__(self):
         return f'{self.user} <--> {self.recipe}'
+
+
+class RecipePopularity(models.Model):
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='popularity'
+    )
+    popular_score = models.FloatField()
+    trending_score = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['-popular_score', 'recipe'],
+                name='popularity_popular_idx'
+            ),
+            models.Index(
+                fields=['-trending_score', 'recipe'],
+                name='popularity_trending_idx'
+            ),
+        ]
+        verbose_name = 'Популярность рецепта'
+        verbose_name_plural = 'Популярность рецептов'
+
+    def __str__(self):
+        return f'{self.recipe}: {self.popular_score:.2f}'
+
+
+class PopularityEvent(models.Model):
+    source = models.CharField(max_length=RECIPES_CHAR_MAX_LEN)
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+'
+    )
+    created = models.DateTimeField()
+    removed = models.BooleanField(default=False)
+
+    class Meta:
+        verbose_name = 'Событие популярности'
+        verbose_name_plural = 'События популярности'
+
+    def __str__(self):
+        return f'{self.source}: {self.recipe_id}'
+
+
+class CacheVersion(models.Model):
+    key = models.CharField(max_length=RECIPES_CHAR_MAX_LEN, primary_key=True)
+    version = models.CharField(max_length=32)
+
+    class Meta:
+        verbose_name = 'Версия кэша'
+        verbose_name_plural = 'Версии кэша'
+
+    def __str__(self):
+        return f'{self.key}: {self.version}'
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    created = models.DateTimeField()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(
+            fields=['user', 'recipe'], name='unique_timeline_entry'
+        )]
+        indexes = [
+            models.Index(
+                fields=['user', '-created', '-recipe'],
+                name='timeline_user_created_idx'
+            ),
+            models.Index(
+                fields=['user', 'author'], name='timeline_user_author_idx'
+            ),
+        ]
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+
+    def __str__(self):
+        return f'{self.user} <-- {self.recipe}'
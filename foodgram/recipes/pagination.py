@@ -1,9 +1,181 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
-from .constants import PAGE_SIZE_RECIPE, MAX_PAGE_SIZE_RECIPE
+from .constants import (
+    ADMIN_COUNT_LIMIT, PAGE_SIZE_RECIPE, MAX_PAGE_SIZE_RECIPE
+)
+from .feed import get_feed_page
 
 
 class CustomPagination(pagination.PageNumberPagination):
     page_size = PAGE_SIZE_RECIPE
     page_size_query_param = 'limit'
     max_page_size = MAX_PAGE_SIZE_RECIPE
+
+
+class KeysetPagination(CustomPagination):
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор'
+    ordering_conflict_message = 'Курсор нельзя сочетать с параметром {}'
+    ordering = ('name', 'id')
+    ordering_params = ('ordering', 'search')
+    page_fallback = True
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            if not self.page_fallback:
+                return None
+            return super().paginate_queryset(queryset, request, view)
+        for param in self.ordering_params:
+            if request.query_params.get(param):
+                raise ValidationError({self.cursor_query_param: [
+                    self.ordering_conflict_message.format(param)
+                ]})
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(
+            request.query_params[self.cursor_query_param]
+        )
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(f'-{field}' for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_keyset_filter(position, reverse)
+            )
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+        self.next_position = self.previous_position = None
+        if results and (has_more or reverse):
+            self.next_position = self.get_position(results[-1])
+        if results and ((has_more and reverse) or (position and not reverse)):
+            self.previous_position = self.get_position(results[0])
+        return results
+
+    def get_keyset_filter(self, position, reverse):
+        lookup = 'lt' if reverse else 'gt'
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            equal = {
+                previous: value for previous, value
+                in zip(self.ordering[:index], position)
+            }
+            condition |= Q(**equal, **{f'{field}__{lookup}': position[index]})
+        bound = Q(**{f'{self.ordering[0]}__{lookup}e': position[0]})
+        return bound & condition
+
+    def get_position(self, obj):
+        position = []
+        for field in self.ordering:
+            value = obj
+            for attr in field.split('__'):
+                value = getattr(value, attr)
+            position.append(value)
+        return position
+
+    def encode_cursor(self, position, reverse):
+        cursor = json.dumps([position, reverse], ensure_ascii=False)
+        return urlsafe_b64encode(cursor.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None, False
+        try:
+            position, reverse = json.loads(urlsafe_b64decode(cursor.encode()))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(position, list)
+            or len(position) != len(self.ordering)
+            or not all(isinstance(value, str) for value in position[:-1])
+            or type(position[-1]) is not int
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(reverse)
+
+    def get_cursor_link(self, position, reverse):
+        if position is None:
+            return None
+        return replace_query_param(
+            remove_query_param(self.base_url, self.page_query_param),
+            self.cursor_query_param,
+            self.encode_cursor(position, reverse)
+        )
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_cursor_link(self.next_position, False)),
+            ('previous', self.get_cursor_link(self.previous_position, True)),
+            ('results', data),
+        ]))
+
+
+class FavoritesPagination(KeysetPagination):
+    ordering = ('recipe__name', 'recipe_id')
+    ordering_params = ()
+    page_fallback = False
+
+
+class FeedPagination(KeysetPagination):
+    ordering = ('created', 'id')
+
+    def paginate_feed(self, user, request):
+        self.keyset = True
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        position, _ = self.decode_cursor(
+            request.query_params.get(self.cursor_query_param)
+        )
+        if position is not None:
+            try:
+                created = parse_datetime(position[0])
+            except ValueError:
+                created = None
+            if created is None:
+                raise NotFound(self.invalid_cursor_message)
+            position = (created, position[1])
+        recipes, rows, has_more = get_feed_page(
+            user, position, self.get_page_size(request)
+        )
+        self.next_position = self.previous_position = None
+        if has_more:
+            created, pk = rows[-1]
+            self.next_position = [created.isoformat(), pk]
+        return recipes
+
+
+class EstimatedCountPaginator(Paginator):
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] > ADMIN_COUNT_LIMIT:
+                return int(row[0])
+        return queryset.order_by()[:ADMIN_COUNT_LIMIT].count()
@@ -0,0 +1,150 @@
+import math
+from collections import Counter
+from datetime import datetime, timezone
+
+from django.db import transaction
+
+from .constants import (
+    FAVORITE_WEIGHT, POPULAR_HALF_LIFE, POPULARITY_BATCH_SIZE,
+    SHOPPING_CART_WEIGHT, TRENDING_HALF_LIFE
+)
+from .models import (
+    Favorites, PopularityEvent, Recipe, RecipePopularity, ShoppingCart
+)
+
+
+EPOCH = datetime(2023, 1, 1, tzinfo=timezone.utc)
+SOURCES = (
+    (Favorites, FAVORITE_WEIGHT),
+    (ShoppingCart, SHOPPING_CART_WEIGHT),
+)
+WEIGHTS = {model._meta.label_lower: weight for model, weight in SOURCES}
+
+
+def get_log_score(weight, created, half_life):
+    return (
+        math.log2(weight)
+        + (created - EPOCH).total_seconds() / half_life
+    )
+
+
+def add_log_scores(first, second):
+    if first is None:
+        return second
+    high, low = max(first, second), min(first, second)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def collect_scores(rows, weight, scores):
+    for recipe_id, created in rows:
+        popular, trending = scores.get(recipe_id, (None, None))
+        scores[recipe_id] = (
+            add_log_scores(
+                popular, get_log_score(weight, created, POPULAR_HALF_LIFE)
+            ),
+            add_log_scores(
+                trending, get_log_score(weight, created, TRENDING_HALF_LIFE)
+            ),
+        )
+
+
+def apply_scores(scores, replace=False):
+    existing = RecipePopularity.objects.select_for_update().in_bulk(
+        list(scores)
+    )
+    for recipe_id, (popular, trending) in scores.items():
+        if recipe_id in existing and replace:
+            row = existing[recipe_id]
+            row.popular_score, row.trending_score = popular, trending
+        elif recipe_id in existing:
+            row = existing[recipe_id]
+            row.popular_score = add_log_scores(row.popular_score, popular)
+            row.trending_score = add_log_scores(row.trending_score, trending)
+    RecipePopularity.objects.bulk_update(
+        existing.values(), ['popular_score', 'trending_score']
+    )
+    recipe_ids = set(Recipe.objects.filter(
+        pk__in=[pk for pk in scores if pk not in existing]
+    ).values_list('pk', flat=True))
+    RecipePopularity.objects.bulk_create(
+        RecipePopularity(
+            recipe_id=recipe_id,
+            popular_score=scores[recipe_id][0],
+            trending_score=scores[recipe_id][1],
+        ) for recipe_id in recipe_ids
+    )
+
+
+def record_events(model, rows, removed=False):
+    PopularityEvent.objects.bulk_create(
+        PopularityEvent(
+            source=model._meta.label_lower, recipe_id=recipe_id,
+            created=created, removed=removed
+        ) for recipe_id, created in rows
+    )
+
+
+def recompute_scores(recipe_ids):
+    if not recipe_ids:
+        return 0
+    rows = [
+        (model._meta.label_lower, recipe_id, created)
+        for model, _ in SOURCES
+        for recipe_id, created in model.objects.filter(
+            recipe_id__in=recipe_ids
+        ).values_list('recipe_id', 'created').iterator()
+    ]
+    pending = Counter(PopularityEvent.objects.filter(
+        recipe_id__in=recipe_ids, removed=False
+    ).values_list('source', 'recipe_id', 'created'))
+    scores = {}
+    counted = 0
+    for row in rows:
+        if pending[row]:
+            pending[row] -= 1
+            continue
+        source, recipe_id, created = row
+        collect_scores([(recipe_id, created)], WEIGHTS[source], scores)
+        counted += 1
+    RecipePopularity.objects.filter(recipe_id__in=recipe_ids).exclude(
+        recipe_id__in=list(scores)
+    ).delete()
+    apply_scores(scores, replace=True)
+    return counted
+
+
+def refresh_popularity(batch_size=POPULARITY_BATCH_SIZE):
+    processed = 0
+    while True:
+        with transaction.atomic():
+            events = list(PopularityEvent.objects.select_for_update(
+            ).order_by('pk')[:batch_size])
+            if not events:
+                return processed
+            removed = {event.recipe_id for event in events if event.removed}
+            scores = {}
+            for event in events:
+                if event.recipe_id not in removed:
+                    collect_scores(
+                        [(event.recipe_id, event.created)],
+                        WEIGHTS[event.source], scores
+                    )
+            apply_scores(scores)
+            PopularityEvent.objects.filter(
+                pk__in=[event.pk for event in events]
+            ).delete()
+            recompute_scores(removed)
+        processed += len(events)
+
+
+@transaction.atomic
+def rebuild_popularity(batch_size=POPULARITY_BATCH_SIZE):
+    RecipePopularity.objects.all().delete()
+    recipe_ids = sorted(set().union(*(
+        model.objects.values_list('recipe_id', flat=True).distinct()
+        for model, _ in SOURCES
+    )))
+    processed = 0
+    for start in range(0, len(recipe_ids), batch_size):
+        processed += recompute_scores(recipe_ids[start:start + batch_size])
+    return processed + refresh_popularity(batch_size)
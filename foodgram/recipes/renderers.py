@@ -0,0 +1,64 @@
+import csv
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class Echo:
+
+    def write(self, value):
+        return value
+
+
+class ShoppingListRenderer(BaseRenderer):
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, ensure_ascii=False).encode(self.charset)
+
+    def render_rows(self, rows):
+        raise NotImplementedError
+
+
+class ShoppingListTextRenderer(ShoppingListRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def render_rows(self, rows):
+        for row in rows:
+            yield (
+                f'{row["ingredient__name"]} '
+                f'({row["ingredient__measurement_unit"]}) '
+                f'— {row["total_amount"]}\n'
+            )
+
+
+class ShoppingListCSVRenderer(ShoppingListRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def render_rows(self, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow(('name', 'measurement_unit', 'amount'))
+        for row in rows:
+            yield writer.writerow((
+                row['ingredient__name'],
+                row['ingredient__measurement_unit'],
+                row['total_amount'],
+            ))
+
+
+class ShoppingListJSONLinesRenderer(ShoppingListRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'jsonl'
+
+    def render_rows(self, rows):
+        for row in rows:
+            yield json.dumps(
+                {
+                    'name': row['ingredient__name'],
+                    'measurement_unit': row['ingredient__measurement_unit'],
+                    'amount': row['total_amount'],
+                },
+                ensure_ascii=False
+            ) + '\n'
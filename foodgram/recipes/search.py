@@ -0,0 +1,72 @@
+from bisect import bisect_left
+from threading import Lock
+
+from .caching import get_version
+from .constants import INGREDIENT_SEARCH_LIMIT
+from .models import Ingredient
+
+
+def normalize(value):
+    return value.casefold().replace('ё', 'е').strip()
+
+
+class IngredientIndex:
+
+    def __init__(self):
+        self._lock = Lock()
+        self._version = None
+        self._data = None
+
+    def _build(self):
+        ingredients = {}
+        names = []
+        words = []
+        for ingredient in Ingredient.objects.all().iterator():
+            ingredients[ingredient.id] = ingredient
+            key = normalize(ingredient.name)
+            names.append((key, ingredient.id))
+            for word in key.split()[1:]:
+                words.append((word, key, ingredient.id))
+        names.sort()
+        words.sort()
+        return ingredients, names, words
+
+    def _get_data(self):
+        version = get_version(Ingredient)
+        if self._version != version:
+            with self._lock:
+                if self._version != version:
+                    self._data = self._build()
+                    self._version = version
+        return self._data
+
+    def search(self, query, limit=INGREDIENT_SEARCH_LIMIT):
+        key = normalize(query)
+        ingredients, names, words = self._get_data()
+        if not key:
+            return [ingredients[pk] for _, pk in names[:limit]]
+        found = []
+        seen = set()
+        index = bisect_left(names, (key,))
+        while (
+            len(found) < limit and index < len(names)
+            and names[index][0].startswith(key)
+        ):
+            found.append(names[index][1])
+            seen.add(names[index][1])
+            index += 1
+        if len(found) < limit:
+            word_matches = []
+            index = bisect_left(words, (key,))
+            while index < len(words) and words[index][0].startswith(key):
+                _, name, pk = words[index]
+                if pk not in seen:
+                    word_matches.append((name, pk))
+                    seen.add(pk)
+                index += 1
+            word_matches.sort()
+            found.extend(pk for _, pk in word_matches[:limit - len(found)])
+        return [ingredients[pk] for pk in found]
+
+
+ingredient_index = IngredientIndex()
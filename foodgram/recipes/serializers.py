@@ -1,7 +1,13 @@
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 from drf_extra_fields.fields import Base64ImageField
 
+from .constants import RECIPE_BATCH_LIMIT
+from .fields import RenditionField
+from .images import discard_image, schedule_renditions
+from .instrumentation import TimedSerializerMixin
+from .membership import FAVORITES, SHOPPING_CART, is_member
 from .models import (
     Ingredient, Tag, IngredientsInRecipe,
     Recipe, Favorites, ShoppingCart
@@ -9,14 +15,14 @@ from .models import (
 from users.serializers import UserSerializer
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(TimedSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Ingredient
         fields = '__all__'
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(TimedSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Tag
@@ -45,14 +51,15 @@ class IngredientsInRecipeSerializer(serializers.ModelSerializer):
         )
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class RecipeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     tags = TagSerializer(many=True)
     ingredients = IngredientsInRecipeSerializer(
         many=True,
         read_only=True,
         source='recipes'
     )
-    image = Base64ImageField()
+    image = RenditionField()
+    image_webp = RenditionField(image_format='webp')
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
     author = UserSerializer(read_only=True)
@@ -61,47 +68,38 @@ class RecipeSerializer(serializers.ModelSerializer):
         model = Recipe
         fields = (
             'id', 'tags', 'author', 'ingredients', 'is_favorited',
-            'is_in_shopping_cart', 'name', 'image', 'text', 'cooking_time'
+            'is_in_shopping_cart', 'name', 'image', 'image_webp', 'text',
+            'cooking_time'
         )
 
     def get_is_favorited(self, obj):
-        return (
-            bool(
-                self.context.get('request')
-                and self.context['request'].user.is_authenticated
-                and obj.favorites_recipe.filter(
-                    user=self.context['request'].user
-                ).exists()
-            )
-        )
+        return is_member(self.context, FAVORITES, obj.id)
 
     def get_is_in_shopping_cart(self, obj):
-        return (
-            bool(
-                self.context.get('request')
-                and self.context['request'].user.is_authenticated
-                and obj.shopping_cart_recipe.filter(
-                    user=self.context['request'].user
-                ).exists()
-            )
-        )
+        return is_member(self.context, SHOPPING_CART, obj.id)
+
 
+class CreateShowSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    image = RenditionField(rendition='thumbnail')
+    image_webp = RenditionField(rendition='thumbnail', image_format='webp')
 
-class CreateShowSerializer(serializers.ModelSerializer):
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_webp', 'cooking_time')
 
 
-class FavoriteSerializer(serializers.ModelSerializer):
+class FavoriteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     id = serializers.IntegerField(source='recipe.id')
     name = serializers.CharField(source='recipe.name')
     cooking_time = serializers.IntegerField(source='recipe.cooking_time')
-    image = Base64ImageField(source='recipe.image')
+    image = RenditionField(rendition='thumbnail', source='recipe')
+    image_webp = RenditionField(
+        rendition='thumbnail', image_format='webp', source='recipe'
+    )
 
     class Meta:
         model = Favorites
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_webp', 'cooking_time')
 
 
 class ShopSerializer(serializers.ModelSerializer):
@@ -111,6 +109,14 @@ class ShopSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class ShoppingListSerializer(TimedSerializerMixin, serializers.Serializer):
+    name = serializers.CharField(source='ingredient__name')
+    measurement_unit = serializers.CharField(
+        source='ingredient__measurement_unit'
+    )
+    amount = serializers.IntegerField(source='total_amount')
+
+
 class FavoriteCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -138,28 +144,48 @@ class ShopCreateSerializer(serializers.ModelSerializer):
 
 
 class IngredientRecipeCreateSerializer(serializers.Serializer):
-    id = serializers.PrimaryKeyRelatedField(queryset=Ingredient.objects.all())
+    id = serializers.IntegerField()
     amount = serializers.IntegerField(min_value=1, max_value=1000)
 
 
-class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
-    tags = serializers.PrimaryKeyRelatedField(
-        many=True, queryset=Tag.objects.all()
+class RecipeBatchSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=RECIPE_BATCH_LIMIT
     )
+
+
+class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
+    tags = serializers.ListField(child=serializers.IntegerField())
     ingredients = IngredientRecipeCreateSerializer(many=True)
     image = Base64ImageField()
 
+    @staticmethod
+    def does_not_exist(pk):
+        return serializers.PrimaryKeyRelatedField.default_error_messages[
+            'does_not_exist'
+        ].format(pk_value=pk)
+
     def validate_tags(self, tags):
         if not tags:
             raise serializers.ValidationError(
                 'Необходимо указать тег/теги.'
             )
+        existing = set(
+            Tag.objects.filter(id__in=tags).values_list('id', flat=True)
+        )
+        missing = [tag for tag in tags if tag not in existing]
+        if missing:
+            raise serializers.ValidationError(
+                [self.does_not_exist(tag) for tag in missing]
+            )
         return tags
 
     def validate_ingredients(self, ingredients):
         ingredient_ids = set()
         for ingredient in ingredients:
-            ingredient_id = ingredient['id'].id
+            ingredient_id = ingredient['id']
             if ingredient_id in ingredient_ids:
                 raise serializers.ValidationError(
                     'Ингредиенты не должны повторяться.'
@@ -169,21 +195,33 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 'Необходимо указать ингредиенты.'
             )
+        existing = set(Ingredient.objects.filter(
+            id__in=ingredient_ids
+        ).values_list('id', flat=True))
+        if existing != ingredient_ids:
+            raise serializers.ValidationError([
+                {} if ingredient['id'] in existing
+                else {'id': [self.does_not_exist(ingredient['id'])]}
+                for ingredient in ingredients
+            ])
         return ingredients
 
     class Meta:
         model = Recipe
         fields = '__all__'
-        read_only_fields = ('author',)
+        read_only_fields = ('author', 'image_renditions')
 
     def to_representation(self, value):
-        return RecipeSerializer(value, context=self.context).data
+        return RecipeSerializer(
+            Recipe.objects.with_related().get(pk=value.pk),
+            context=self.context
+        ).data
 
     @staticmethod
     def create_ingredients(recipe, ingredients_data):
         ingredients = []
         for ingredient_data in ingredients_data:
-            ingredient_id = ingredient_data['id'].id
+            ingredient_id = ingredient_data['id']
             amount = ingredient_data['amount']
             ingredients.append(IngredientsInRecipe(
                 ingredient_id=ingredient_id,
@@ -192,20 +230,60 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
             ))
         IngredientsInRecipe.objects.bulk_create(ingredients)
 
+    @classmethod
+    def update_ingredients(cls, recipe, ingredients_data):
+        current = {
+            ingredient.ingredient_id: ingredient
+            for ingredient in IngredientsInRecipe.objects.filter(recipe=recipe)
+        }
+        amounts = {
+            ingredient_data['id']: ingredient_data['amount']
+            for ingredient_data in ingredients_data
+        }
+        removed = current.keys() - amounts.keys()
+        if removed:
+            IngredientsInRecipe.objects.filter(
+                recipe=recipe, ingredient_id__in=removed
+            ).delete()
+        changed = []
+        for ingredient_id, ingredient in current.items():
+            amount = amounts.get(ingredient_id)
+            if amount is not None and ingredient.amount != amount:
+                ingredient.amount = amount
+                changed.append(ingredient)
+        if changed:
+            IngredientsInRecipe.objects.bulk_update(changed, ['amount'])
+        cls.create_ingredients(recipe, [
+            ingredient_data for ingredient_data in ingredients_data
+            if ingredient_data['id'] not in current
+        ])
+
+    @transaction.atomic
     def create(self, validated_data):
         validated_data['author'] = self.context['request'].user
         tags_data = validated_data.pop('tags')
         ingredients_data = validated_data.pop('ingredients')
         recipe = Recipe.objects.create(**validated_data)
-        for tag_data in tags_data:
-            recipe.tags.add(tag_data)
+        recipe.tags.add(*tags_data)
         self.create_ingredients(recipe, ingredients_data)
+        if recipe.image:
+            schedule_renditions(recipe)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        tags_data = validated_data.pop('tags')
-        ingredients_data = validated_data.pop('ingredients')
-        instance.tags.set(tags_data)
-        instance.ingredients.clear()
-        self.create_ingredients(instance, ingredients_data)
-        return super().update(instance, validated_data)
+        tags_data = validated_data.pop('tags', None)
+        ingredients_data = validated_data.pop('ingredients', None)
+        if tags_data is not None:
+            instance.tags.set(tags_data)
+        if ingredients_data is not None:
+            self.update_ingredients(instance, ingredients_data)
+        previous = instance.image.name, instance.image_renditions
+        if 'image' in validated_data:
+            validated_data['image_renditions'] = {}
+        instance = super().update(instance, validated_data)
+        if 'image' in validated_data:
+            discard_image(*previous)
+        if 'image' in validated_data and instance.image:
+            schedule_renditions(instance)
+        return instance
@@ -0,0 +1,96 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from users.models import Follow, User
+from .membership import FAVORITES, FOLLOWS, SHOPPING_CART, invalidate_ids
+from .caching import bump_version
+from .counters import change_counter
+from .feed import backfill_timeline, fan_out_recipe, trim_timeline
+from .fulltext import install_sqlite_triggers
+from .images import discard_image
+from .instrumentation import record_query
+from .models import Favorites, Ingredient, Recipe, ShoppingCart, Tag
+from .popularity import record_events
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(post_migrate)
+def install_search_triggers(sender, using, **kwargs):
+    if sender.name == 'recipes':
+        install_sqlite_triggers(using)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def bump_reference_version(sender, **kwargs):
+    bump_version(sender)
+
+
+@receiver(post_save, sender=Favorites)
+def add_favorite(sender, instance, created, **kwargs):
+    if created:
+        invalidate_ids(FAVORITES, instance.user_id)
+        change_counter(Recipe, instance.recipe_id, 'favorites_count', 1)
+        record_events(sender, [(instance.recipe_id, instance.created)])
+
+
+@receiver(post_delete, sender=Favorites)
+def remove_favorite(sender, instance, **kwargs):
+    invalidate_ids(FAVORITES, instance.user_id)
+    change_counter(Recipe, instance.recipe_id, 'favorites_count', -1)
+    record_events(
+        sender, [(instance.recipe_id, instance.created)], removed=True
+    )
+
+
+@receiver(post_save, sender=ShoppingCart)
+def add_to_shopping_cart(sender, instance, created, **kwargs):
+    if created:
+        invalidate_ids(SHOPPING_CART, instance.user_id)
+        change_counter(Recipe, instance.recipe_id, 'shopping_cart_count', 1)
+        record_events(sender, [(instance.recipe_id, instance.created)])
+
+
+@receiver(post_delete, sender=ShoppingCart)
+def remove_from_shopping_cart(sender, instance, **kwargs):
+    invalidate_ids(SHOPPING_CART, instance.user_id)
+    change_counter(Recipe, instance.recipe_id, 'shopping_cart_count', -1)
+    record_events(
+        sender, [(instance.recipe_id, instance.created)], removed=True
+    )
+
+
+@receiver(post_save, sender=Follow)
+def add_follow(sender, instance, created, **kwargs):
+    if created:
+        invalidate_ids(FOLLOWS, instance.user_id)
+        change_counter(User, instance.author_id, 'followers_count', 1)
+        backfill_timeline(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def remove_follow(sender, instance, **kwargs):
+    invalidate_ids(FOLLOWS, instance.user_id)
+    change_counter(User, instance.author_id, 'followers_count', -1)
+    trim_timeline(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=Recipe)
+def add_recipe(sender, instance, created, **kwargs):
+    if created:
+        change_counter(User, instance.author_id, 'recipes_count', 1)
+        fan_out_recipe(instance)
+
+
+@receiver(post_delete, sender=Recipe)
+def remove_recipe(sender, instance, **kwargs):
+    change_counter(User, instance.author_id, 'recipes_count', -1)
+    discard_image(instance.image.name, instance.image_renditions)
@@ -0,0 +1,26 @@
+import threading
+
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from recipes.concurrency import async_view
+
+
+class AsyncViewTests(SimpleTestCase):
+
+    def test_only_reads_leave_the_request_thread(self):
+        threads = {}
+
+        def view(request):
+            threads[request.method] = threading.get_ident()
+            return HttpResponse()
+
+        wrapped = async_to_sync(async_view(view))
+        for method in ('GET', 'HEAD', 'POST', 'PATCH', 'DELETE'):
+            wrapped(RequestFactory().generic(method, '/api/recipes/'))
+        current = threading.get_ident()
+        for method in ('POST', 'PATCH', 'DELETE'):
+            self.assertEqual(threads[method], current)
+        for method in ('GET', 'HEAD'):
+            self.assertNotEqual(threads[method], current)
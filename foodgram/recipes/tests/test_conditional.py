@@ -0,0 +1,82 @@
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from users.models import User
+from recipes.models import Ingredient, IngredientsInRecipe, Recipe, Tag
+
+
+class RecipeConditionalTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author, cls.reader = (
+            User.objects.create_user(
+                email=f'{name}@example.com', username=name,
+                first_name='Имя', last_name='Фамилия', password='password'
+            ) for name in ('author', 'reader')
+        )
+        cls.tag = Tag.objects.create(name='Обед', slug='lunch')
+        cls.ingredient = Ingredient.objects.create(
+            name='Свёкла', measurement_unit='г'
+        )
+        cls.recipe = Recipe.objects.create(
+            name='Борщ', text='Суп', cooking_time=30,
+            author=cls.author, image='recipes/test.png'
+        )
+        cls.recipe.tags.set([cls.tag])
+        IngredientsInRecipe.objects.create(
+            recipe=cls.recipe, ingredient=cls.ingredient, amount=200
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.url = f'/api/recipes/{self.recipe.pk}/'
+
+    def get(self, **headers):
+        return self.client.get(self.url, **headers)
+
+    def assert_revalidated(self, change):
+        etag = self.get()['ETag']
+        self.assertEqual(
+            self.get(HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_304_NOT_MODIFIED
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def rename(self, instance, field, value):
+        def change():
+            setattr(instance, field, value)
+            instance.save()
+        return change
+
+    def post(self, url):
+        return lambda: self.client.post(url)
+
+    def test_anonymous(self):
+        changes = (
+            ('author', self.rename(self.author, 'first_name', 'Другое')),
+            ('tag', self.rename(self.tag, 'name', 'Ужин')),
+            ('ingredient', self.rename(self.ingredient, 'name', 'Морковь')),
+            ('recipe', self.rename(self.recipe, 'text', 'Суп с фасолью')),
+        )
+        for name, change in changes:
+            with self.subTest(change=name):
+                self.assert_revalidated(change)
+        self.assertNotIn('Last-Modified', self.get())
+
+    def test_authenticated(self):
+        self.client.force_authenticate(self.reader)
+        changes = (
+            ('follow', self.post(f'/api/users/{self.author.pk}/subscribe/')),
+            ('favorite', self.post(f'{self.url}favorite/')),
+            ('cart', self.post(f'{self.url}shopping_cart/')),
+            ('author', self.rename(self.author, 'last_name', 'Другая')),
+        )
+        for name, change in changes:
+            with self.subTest(change=name):
+                self.assert_revalidated(change)
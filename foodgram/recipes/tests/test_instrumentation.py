@@ -0,0 +1,67 @@
+import json
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from users.models import User
+from recipes.instrumentation import QueryBudgetExceeded
+from recipes.models import Recipe
+
+
+class InstrumentationTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='user@example.com', username='user',
+            first_name='Имя', last_name='Фамилия', password='password'
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def download(self):
+        response = self.client.get('/api/recipes/download_shopping_cart/')
+        return b''.join(response.streaming_content)
+
+    def test_streaming_queries_logged(self):
+        with self.assertLogs('recipes.instrumentation', 'DEBUG') as logs:
+            self.download()
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(
+            record['view'], 'RecipeViewSet.download_shopping_cart'
+        )
+        self.assertGreater(record['queries'], 0)
+
+    @override_settings(
+        QUERY_BUDGETS={
+            'RecipeViewSet.download_shopping_cart': {'queries': 0},
+        },
+        QUERY_BUDGET_RAISE=True
+    )
+    def test_streaming_budget(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.download()
+
+    @override_settings(QUERY_BUDGET_RAISE=True)
+    def test_cold_cache_within_budget(self):
+        recipe = Recipe.objects.create(
+            name='Борщ', text='Суп', cooking_time=30,
+            author=self.user, image='recipes/test.png'
+        )
+        self.client.force_authenticate(None)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.user)}'
+        )
+        for url in (
+            '/api/tags/', '/api/ingredients/', '/api/recipes/',
+            f'/api/recipes/{recipe.pk}/', '/api/recipes/feed/',
+            '/api/users/subscriptions/',
+        ):
+            with self.subTest(url=url):
+                cache.clear()
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,62 @@
+import json
+from base64 import urlsafe_b64encode
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from users.models import User
+
+
+def encode_cursor(value):
+    return urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+class CursorTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='user@example.com', username='user',
+            first_name='Имя', last_name='Фамилия', password='password'
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def assert_invalid_cursors(self, url, cursors):
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(
+                    url, {'cursor': encode_cursor(cursor)}
+                )
+                self.assertEqual(
+                    response.status_code, status.HTTP_404_NOT_FOUND
+                )
+
+    def test_invalid_keyset_cursor(self):
+        cursors = (
+            [['x', 'y'], False],
+            [[1, 2], False],
+            [['x', True], False],
+            [['x'], False],
+            ['x', False],
+        )
+        for url in ('/api/recipes/', '/api/recipes/favorites/'):
+            self.assert_invalid_cursors(url, cursors)
+
+    def test_invalid_feed_cursor(self):
+        self.assert_invalid_cursors('/api/recipes/feed/', (
+            [['2026-13-01T00:00:00+00:00', 1], False],
+            [['2026-02-30T00:00:00+00:00', 1], False],
+            [['вчера', 1], False],
+            [['2026-01-01T00:00:00+00:00', '1'], False],
+        ))
+
+    def test_cursor_with_ordering(self):
+        response = self.client.get(
+            '/api/recipes/', {'ordering': 'popular', 'cursor': ''}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('cursor', response.data)
+        response = self.client.get('/api/recipes/', {'ordering': 'popular'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
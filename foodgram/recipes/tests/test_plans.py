@@ -0,0 +1,143 @@
+import json
+from random import Random
+from types import SimpleNamespace
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from users.models import User
+from recipes.benchmark import generate
+from recipes.feed import get_keyset_filter
+from recipes.filters import FilterForRecipes
+from recipes.models import Recipe, TimelineEntry
+from recipes.pagination import KeysetPagination
+
+
+PLANNER_SETTINGS = ('enable_seqscan', 'enable_hashjoin', 'enable_mergejoin')
+INDEX_SCANS = ('Index Scan', 'Index Only Scan', 'Bitmap Index Scan')
+
+
+class QueryPlanTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        users, tags, _, recipes = generate(
+            Random(0), users=100, recipes=2000, ingredients=100,
+            ingredients_per_recipe=2, follows=10, favorites=20, carts=20
+        )
+        User.objects.bulk_create(
+            User(
+                email=f'reader{index}@example.com',
+                username=f'reader{index}',
+                first_name=f'Имя {index}', last_name=f'Фамилия {index}'
+            ) for index in range(5000)
+        )
+        cls.user = users[0]
+        cls.authors = list(cls.user.follower.values_list('author', flat=True))
+        cls.tags = tags[:2]
+        cls.position = [recipes[1500].name, recipes[1500].id]
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def filter_recipes(self, **data):
+        return FilterForRecipes(
+            data, queryset=Recipe.objects.all(),
+            request=SimpleNamespace(user=self.user)
+        ).qs
+
+    def explain(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                return [detail for *_, detail in cursor.fetchall()]
+            for setting in PLANNER_SETTINGS:
+                cursor.execute(f'SET LOCAL {setting} = off')
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+        nodes = []
+        pending = [plan[0]['Plan']]
+        while pending:
+            node = pending.pop()
+            pending.extend(node.get('Plans', ()))
+            nodes.append(node)
+        return nodes
+
+    def get_full_scans(self, queryset):
+        plan = self.explain(queryset)
+        if connection.vendor == 'sqlite':
+            return [
+                detail for detail in plan
+                if detail.startswith('SCAN ') and detail != 'SCAN CONSTANT ROW'
+            ]
+        return [
+            '{} on {}'.format(
+                node['Node Type'],
+                node.get('Index Name', node.get('Relation Name'))
+            ) for node in plan
+            if node['Node Type'] == 'Seq Scan' or (
+                node['Node Type'] in INDEX_SCANS and 'Index Cond' not in node
+            )
+        ]
+
+    def get_index_conditions(self, queryset):
+        plan = self.explain(queryset)
+        if connection.vendor == 'sqlite':
+            return [detail for detail in plan if detail.startswith('SEARCH ')]
+        return [node['Index Cond'] for node in plan if 'Index Cond' in node]
+
+    def assert_no_full_scan(self, queryset):
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            self.skipTest('Нет разбора плана для этой СУБД')
+        self.assertEqual(self.get_full_scans(queryset), [])
+
+    def test_is_favorited(self):
+        self.assert_no_full_scan(self.filter_recipes(is_favorited=True))
+
+    def test_is_in_shopping_cart(self):
+        self.assert_no_full_scan(
+            self.filter_recipes(is_in_shopping_cart=True)
+        )
+
+    def test_tags(self):
+        self.assert_no_full_scan(
+            self.filter_recipes(tags=[tag.slug for tag in self.tags])
+        )
+
+    def test_keyset(self):
+        pagination = KeysetPagination()
+        self.assert_no_full_scan(
+            Recipe.objects.order_by(*pagination.ordering).filter(
+                pagination.get_keyset_filter(self.position, False)
+            )[:pagination.page_size + 1]
+        )
+
+    def test_subscriptions(self):
+        self.assert_no_full_scan(
+            User.objects.filter(follow__user=self.user).order_by(
+                'last_name', 'first_name'
+            )
+        )
+
+    def test_full_scan_detected(self):
+        with self.assertRaises(AssertionError):
+            self.assert_no_full_scan(Recipe.objects.filter(text='Описание'))
+
+    def test_subscriptions_recipes(self):
+        self.assert_no_full_scan(
+            Recipe.objects.filter(author__in=self.authors)
+        )
+
+    def test_feed(self):
+        queryset = TimelineEntry.objects.filter(
+            get_keyset_filter((timezone.now(), 1), 'recipe_id'),
+            user=self.user
+        ).order_by('-created', '-recipe_id')[:11]
+        self.assert_no_full_scan(queryset)
+        self.assertTrue(any(
+            'created' in condition
+            for condition in self.get_index_conditions(queryset)
+        ))
@@ -0,0 +1,92 @@
+from rest_framework.test import APITestCase
+
+from users.models import User
+from recipes.models import Recipe, RecipePopularity
+from recipes.popularity import rebuild_popularity, refresh_popularity
+
+
+class PopularityTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(
+                email=f'user{index}@example.com', username=f'user{index}',
+                first_name='Имя', last_name='Фамилия', password='password'
+            ) for index in range(2)
+        ]
+        cls.recipes = [
+            Recipe.objects.create(
+                name=f'Рецепт {index}', text='Описание', cooking_time=10,
+                author=cls.users[0], image='recipes/test.png'
+            ) for index in range(3)
+        ]
+
+    def setUp(self):
+        self.client.force_authenticate(self.users[1])
+
+    def get_scores(self):
+        return {
+            row.recipe_id: (row.popular_score, row.trending_score)
+            for row in RecipePopularity.objects.all()
+        }
+
+    def assert_rebuilt(self):
+        scores = self.get_scores()
+        rebuild_popularity()
+        rebuilt = self.get_scores()
+        self.assertEqual(scores.keys(), rebuilt.keys())
+        for recipe_id, values in scores.items():
+            for value, expected in zip(values, rebuilt[recipe_id]):
+                self.assertAlmostEqual(value, expected)
+        return scores
+
+    def toggle(self, url, recipe):
+        self.client.post(f'/api/recipes/{recipe.id}/{url}/')
+        self.client.delete(f'/api/recipes/{recipe.id}/{url}/')
+
+    def test_toggle_does_not_inflate(self):
+        first, second, _ = self.recipes
+        self.client.post(f'/api/recipes/{first.id}/favorite/')
+        self.client.post(f'/api/recipes/{second.id}/favorite/')
+        refresh_popularity()
+        scores = self.assert_rebuilt()
+        for _ in range(3):
+            self.toggle('favorite', second)
+            self.client.post(f'/api/recipes/{second.id}/favorite/')
+            refresh_popularity()
+        self.assertGreater(scores[second.id][0], scores[first.id][0])
+        self.assertLess(
+            self.assert_rebuilt()[second.id][0] - scores[second.id][0], 1
+        )
+        self.client.delete(f'/api/recipes/{second.id}/favorite/')
+        refresh_popularity()
+        self.assertNotIn(second.id, self.assert_rebuilt())
+
+    def test_batch_changes(self):
+        ids = [recipe.id for recipe in self.recipes]
+        for url in ('favorite', 'shopping_cart'):
+            self.client.post(
+                f'/api/recipes/{url}/batch/', {'recipes': ids}, format='json'
+            )
+        refresh_popularity()
+        self.assertEqual(set(self.assert_rebuilt()), set(ids))
+        self.client.delete(
+            '/api/recipes/favorite/batch/', {'recipes': ids[:2]},
+            format='json'
+        )
+        self.client.delete(
+            '/api/recipes/shopping_cart/batch/', {'recipes': ids[:1]},
+            format='json'
+        )
+        refresh_popularity()
+        self.assertEqual(set(self.assert_rebuilt()), set(ids[1:]))
+
+    def test_pending_events_after_rebuild(self):
+        recipe = self.recipes[0]
+        self.toggle('favorite', recipe)
+        self.client.post(f'/api/recipes/{recipe.id}/shopping_cart/')
+        rebuild_popularity()
+        scores = self.get_scores()
+        refresh_popularity()
+        self.assertEqual(self.get_scores(), scores)
@@ -0,0 +1,100 @@
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from users.models import Follow, User
+from recipes.models import (
+    Favorites, Ingredient, IngredientsInRecipe, Recipe, ShoppingCart, Tag
+)
+
+
+class RecipeQueryBudgetTests(APITestCase):
+    LIST_QUERIES = 4
+    RETRIEVE_QUERIES = 4
+    MEMBERSHIP_QUERIES = 3
+    VERSION_QUERIES = 1
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(
+                email=f'user{index}@example.com', username=f'user{index}',
+                first_name='Имя', last_name='Фамилия', password='password'
+            ) for index in range(4)
+        ]
+        tags = [
+            Tag.objects.create(
+                name=f'Тег {index}', slug=f'tag{index}',
+                color=f'#00000{index}'
+            ) for index in range(3)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f'Ингредиент {index}', measurement_unit='г'
+            ) for index in range(10)
+        ]
+        for index in range(12):
+            recipe = Recipe.objects.create(
+                name=f'Рецепт {index}', text='Описание', cooking_time=10,
+                author=cls.users[index % 4], image='recipes/test.png'
+            )
+            recipe.tags.set(tags[:1 + index % 3])
+            IngredientsInRecipe.objects.bulk_create(
+                IngredientsInRecipe(
+                    recipe=recipe, amount=shift + 1,
+                    ingredient=ingredients[(index + shift) % 10]
+                ) for shift in range(4)
+            )
+            if index % 2:
+                Favorites.objects.create(user=cls.users[0], recipe=recipe)
+                ShoppingCart.objects.create(user=cls.users[0], recipe=recipe)
+        for author in cls.users[1:]:
+            Follow.objects.create(user=cls.users[0], author=author)
+        cls.recipe = Recipe.objects.get(name='Рецепт 1')
+
+    def setUp(self):
+        cache.clear()
+
+    def assert_list_queries(self, expected):
+        for limit in (2, 10):
+            cache.clear()
+            with self.assertNumQueries(expected):
+                response = self.client.get(
+                    '/api/recipes/', {'limit': limit}
+                )
+            self.assertEqual(len(response.data['results']), limit)
+
+    def test_list_anonymous(self):
+        self.assert_list_queries(self.LIST_QUERIES)
+
+    def test_list_authenticated(self):
+        self.client.force_authenticate(self.users[0])
+        self.assert_list_queries(
+            self.LIST_QUERIES + self.MEMBERSHIP_QUERIES
+        )
+
+    def test_list_cursor(self):
+        for limit in (2, 10):
+            with self.assertNumQueries(self.LIST_QUERIES - 1):
+                response = self.client.get(
+                    '/api/recipes/', {'limit': limit, 'cursor': ''}
+                )
+            self.assertEqual(len(response.data['results']), limit)
+
+    def test_retrieve_anonymous(self):
+        with self.assertNumQueries(
+            self.RETRIEVE_QUERIES + self.VERSION_QUERIES
+        ):
+            response = self.client.get(f'/api/recipes/{self.recipe.pk}/')
+        self.assertEqual(len(response.data['ingredients']), 4)
+
+    def test_retrieve_authenticated(self):
+        self.client.force_authenticate(self.users[0])
+        with self.assertNumQueries(
+            self.RETRIEVE_QUERIES + self.VERSION_QUERIES
+            + self.MEMBERSHIP_QUERIES
+        ):
+            self.client.get(f'/api/recipes/{self.recipe.pk}/')
+        with self.assertNumQueries(self.RETRIEVE_QUERIES):
+            response = self.client.get(f'/api/recipes/{self.recipe.pk}/')
+        self.assertTrue(response.data['is_favorited'])
+        self.assertTrue(response.data['author']['is_subscribed'])
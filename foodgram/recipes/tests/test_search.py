@@ -0,0 +1,88 @@
+import shutil
+import tempfile
+
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from users.models import User
+from recipes.benchmark import get_image
+from recipes.models import Ingredient, Tag
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class RecipeSearchTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='user@example.com', username='user',
+            first_name='Имя', last_name='Фамилия', password='password'
+        )
+        cls.tag = Tag.objects.create(name='Обед', slug='lunch')
+        cls.ingredient = Ingredient.objects.create(
+            name='Свёкла', measurement_unit='г'
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def create_recipe(self, name, text):
+        response = self.client.post('/api/recipes/', {
+            'name': name,
+            'text': text,
+            'cooking_time': 30,
+            'image': get_image(),
+            'tags': [self.tag.id],
+            'ingredients': [{'id': self.ingredient.id, 'amount': 200}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['id']
+
+    def search(self, query):
+        response = self.client.get('/api/recipes/', {'search': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [recipe['id'] for recipe in response.data['results']]
+
+    def test_search_created_recipe(self):
+        borscht = self.create_recipe('Обед', 'суп борщ')
+        self.create_recipe('Ужин', 'салат')
+        self.assertEqual(self.search('борщ'), [borscht])
+        self.assertEqual(self.search('пельмени'), [])
+
+    def test_search_ranks_name_first(self):
+        in_text = self.create_recipe('Обед', 'суп борщ')
+        in_name = self.create_recipe('Борщ', 'суп')
+        self.assertEqual(self.search('борщ'), [in_name, in_text])
+
+    def test_search_updated_recipe(self):
+        recipe = self.create_recipe('Обед', 'суп борщ')
+        response = self.client.patch(f'/api/recipes/{recipe}/', {
+            'text': 'суп харчо',
+            'tags': [self.tag.id],
+            'ingredients': [{'id': self.ingredient.id, 'amount': 200}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.search('харчо'), [recipe])
+        self.assertEqual(self.search('борщ'), [])
+
+    def test_search_deleted_recipe(self):
+        recipe = self.create_recipe('Обед', 'суп борщ')
+        self.client.delete(f'/api/recipes/{recipe}/')
+        self.assertEqual(self.search('борщ'), [])
+
+    def test_search_with_cursor(self):
+        self.create_recipe('Обед', 'суп борщ')
+        response = self.client.get(
+            '/api/recipes/', {'search': 'борщ', 'cursor': ''}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('cursor', response.data)
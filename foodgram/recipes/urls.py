@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from .concurrency import async_urls
 from .views import RecipeViewSet, IngredientViewSet, TagViewSet
 
 
@@ -11,6 +13,14 @@ router.register('recipes', RecipeViewSet, basename='recipe')
 router.register('ingredients', IngredientViewSet, basename='ingredient')
 router.register('tags', TagViewSet, basename='tag')
 
+urls = router.urls
+if settings.ASYNC_VIEWS:
+    urls = async_urls(urls, (
+        'recipe-list', 'recipe-detail',
+        'ingredient-list', 'ingredient-detail',
+        'tag-list', 'tag-detail',
+    ))
+
 urlpatterns = [
-    path('', include(router.urls)),
+    path('', include(urls)),
 ]
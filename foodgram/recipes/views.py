@@ -1,37 +1,71 @@
-from io import StringIO
-from collections import defaultdict
+import hashlib
 
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.parsers import FileUploadParser, MultiPartParser
 from rest_framework import permissions, serializers
 from rest_framework.response import Response
-from rest_framework.filters import SearchFilter
 from django_filters.rest_framework import DjangoFilterBackend
-from django.http import HttpResponse
+from django.db import transaction
+from django.db.models import Sum
+from django.http import StreamingHttpResponse
+from django.utils.cache import (
+    get_conditional_response, patch_vary_headers
+)
 
+from users.models import User
+from .caching import CachedResponseMixin, get_versions
+from .constants import (
+    IMAGE_MAX_SIZE, SHOPPING_LIST_CHUNK_SIZE, UPLOAD_OVERHEAD
+)
+from .counters import change_counters
 from .models import (
     Ingredient, Tag, Recipe, Favorites, ShoppingCart, IngredientsInRecipe
 )
 from .permissions import IsAuthorOrReadOnlyPermission
-from .filters import FilterForRecipes, IngredientFilter
-from .pagination import CustomPagination
+from .popularity import record_events
+from .filters import FilterForRecipes
+from .images import (
+    LimitedUploadHandler, discard_image, schedule_renditions, validate_upload
+)
+from .membership import (
+    FAVORITES, FOLLOWS, SHOPPING_CART, invalidate_ids, is_member
+)
+from .pagination import (
+    CustomPagination, FavoritesPagination, FeedPagination, KeysetPagination
+)
+from .renderers import (
+    ShoppingListTextRenderer, ShoppingListCSVRenderer,
+    ShoppingListJSONLinesRenderer
+)
+from .search import ingredient_index
 from .serializers import (
     IngredientSerializer, TagSerializer, RecipeSerializer,
     FavoriteCreateSerializer, ShopCreateSerializer,
-    RecipeCreateUpdateSerializer, FavoriteSerializer, CreateShowSerializer
+    RecipeCreateUpdateSerializer, FavoriteSerializer, CreateShowSerializer,
+    ShoppingListSerializer, RecipeBatchSerializer
 )
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(
+    CachedResponseMixin, viewsets.ReadOnlyModelViewSet
+):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = (permissions.AllowAny,)
-    filter_backends = (SearchFilter,)
-    filterset_class = IngredientFilter
-    search_fields = ('^name',)
 
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if not name:
+            return super().list(request, *args, **kwargs)
+        serializer = self.get_serializer(
+            ingredient_index.search(name), many=True
+        )
+        return Response(serializer.data)
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+
+class TagViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (permissions.AllowAny,)
@@ -42,10 +76,80 @@ class RecipeViewSet(viewsets.ModelViewSet):
     serializer_class = RecipeSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = FilterForRecipes
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
     permission_classes = [IsAuthorOrReadOnlyPermission, ]
     http_method_names = ['get', 'post', 'patch', 'delete']
 
+    def get_queryset(self):
+        if self.action in ('list', 'retrieve'):
+            return Recipe.objects.with_related()
+        return Recipe.objects.all()
+
+    def get_recipe_etag(self, pk, updated, author_id, *author):
+        context = {'request': self.request}
+        validator = ':'.join(str(value) for value in (
+            pk,
+            updated.isoformat(),
+            *get_versions(Tag, Ingredient),
+            author_id,
+            *author,
+            is_member(context, FAVORITES, pk),
+            is_member(context, SHOPPING_CART, pk),
+            is_member(context, FOLLOWS, author_id),
+        ))
+        return '"{}"'.format(hashlib.sha1(validator.encode()).hexdigest())
+
+    def retrieve(self, request, *args, **kwargs):
+        etag = self.get_recipe_etag(*get_object_or_404(
+            Recipe.objects.values_list(
+                'pk', 'updated', 'author_id', 'author__email',
+                'author__username', 'author__first_name', 'author__last_name'
+            ),
+            pk=kwargs['pk']
+        ))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+    @action(
+        detail=True, methods=['post'],
+        parser_classes=[MultiPartParser, FileUploadParser]
+    )
+    def image(self, request, pk=None):
+        recipe = self.get_object()
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            raise serializers.ValidationError(
+                {'image': ['Некорректная длина запроса.']}
+            )
+        if content_length > IMAGE_MAX_SIZE + UPLOAD_OVERHEAD:
+            raise serializers.ValidationError(
+                {'image': ['Файл слишком большой.']}
+            )
+        request._request.upload_handlers = [
+            LimitedUploadHandler(request._request)
+        ]
+        upload = request.data.get('image') or request.data.get('file')
+        if upload is None:
+            raise serializers.ValidationError(
+                {'image': ['Файл не передан.']}
+            )
+        previous = recipe.image.name, recipe.image_renditions
+        recipe.image.save(validate_upload(upload), upload, save=False)
+        upload.close()
+        recipe.image_renditions = {}
+        recipe.save(update_fields=['image', 'image_renditions', 'updated'])
+        discard_image(*previous)
+        schedule_renditions(recipe)
+        serializer = RecipeSerializer(
+            recipe, context=self.get_serializer_context()
+        )
+        return Response(serializer.data)
+
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return RecipeSerializer
@@ -57,8 +161,9 @@ class RecipeViewSet(viewsets.ModelViewSet):
         detail=True, methods=['post', 'delete'],
         permission_classes=[permissions.IsAuthenticated, ]
     )
+    @transaction.atomic
     def favorite(self, request, pk):
-        user = self.request.user
+        user = self.lock_user(request)
         recipe = self.get_object()
         if request.method == 'POST':
             data = {
@@ -92,17 +197,26 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=[permissions.IsAuthenticated, ]
     )
     def favorites(self, request):
-        favorites = Favorites.objects.filter(user=request.user)
+        favorites = Favorites.objects.filter(
+            user=request.user
+        ).select_related('recipe')
+        paginator = FavoritesPagination()
+        page = paginator.paginate_queryset(favorites, request, view=self)
         serializer = FavoriteSerializer(
-            favorites, many=True, context={'request': request}
+            favorites if page is None else page,
+            many=True, context={'request': request}
         )
-        return Response(serializer.data)
+        if page is None:
+            return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
     @action(
         detail=True, methods=['post', 'delete'],
         permission_classes=[permissions.IsAuthenticated, ]
     )
+    @transaction.atomic
     def shopping_cart(self, request, pk=None):
+        self.lock_user(request)
         recipe = self.get_object()
 
         if request.method == 'POST':
@@ -139,34 +253,134 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_204_NO_CONTENT
             )
 
+    def lock_user(self, request):
+        return User.objects.select_for_update().get(pk=request.user.pk)
+
+    @transaction.atomic
+    def change_batch(self, request, model, kind, counter):
+        serializer = RecipeBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data['recipes']))
+        user = self.lock_user(request)
+        add = request.method == 'POST'
+        found = set(
+            Recipe.objects.filter(pk__in=ids).values_list('pk', flat=True)
+        )
+        current = dict(model.objects.filter(
+            user=user, recipe_id__in=found
+        ).values_list('recipe_id', 'created'))
+        if add:
+            changed = found - set(current)
+            rows = model.objects.bulk_create(
+                (model(user=user, recipe_id=pk) for pk in changed),
+                ignore_conflicts=True
+            )
+            record_events(
+                model, ((row.recipe_id, row.created) for row in rows)
+            )
+        else:
+            changed = set(current)
+            queryset = model.objects.filter(user=user, recipe_id__in=changed)
+            queryset._raw_delete(queryset.db)
+            record_events(model, current.items(), removed=True)
+        change_counters(Recipe, changed, counter, 1 if add else -1)
+        if changed:
+            invalidate_ids(kind, user.id)
+        done, skipped = ('added', 'exists') if add else ('removed', 'missing')
+        return Response({'results': [
+            {
+                'id': pk,
+                'status': (
+                    done if pk in changed
+                    else skipped if pk in found
+                    else 'not_found'
+                ),
+            } for pk in ids
+        ]})
+
+    @action(
+        detail=False, methods=['post', 'delete'],
+        permission_classes=[permissions.IsAuthenticated],
+        url_path='favorite/batch', url_name='favorite-batch'
+    )
+    def favorite_batch(self, request):
+        return self.change_batch(
+            request, Favorites, FAVORITES, 'favorites_count'
+        )
+
+    @action(
+        detail=False, methods=['post', 'delete'],
+        permission_classes=[permissions.IsAuthenticated],
+        url_path='shopping_cart/batch', url_name='shopping-cart-batch'
+    )
+    def shopping_cart_batch(self, request):
+        return self.change_batch(
+            request, ShoppingCart, SHOPPING_CART, 'shopping_cart_count'
+        )
+
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        queryset = Recipe.objects.with_related().filter(
+            popularity__isnull=False
+        ).order_by('-popularity__trending_score', 'id')
+        paginator = CustomPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = RecipeSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False, methods=['get'],
+        permission_classes=[permissions.IsAuthenticated]
+    )
+    def feed(self, request):
+        paginator = FeedPagination()
+        recipes = paginator.paginate_feed(request.user, request)
+        serializer = RecipeSerializer(
+            recipes, many=True, context=self.get_serializer_context()
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+    @staticmethod
+    def get_shopping_list(user):
+        return IngredientsInRecipe.objects.filter(
+            recipe__shopping_cart_recipe__user=user
+        ).values(
+            'ingredient__name', 'ingredient__measurement_unit'
+        ).annotate(
+            total_amount=Sum('amount')
+        ).order_by('ingredient__name')
+
     @action(
         detail=False, methods=['get'],
         permission_classes=[permissions.IsAuthenticated]
     )
+    def shopping_list(self, request):
+        serializer = ShoppingListSerializer(
+            self.get_shopping_list(request.user), many=True
+        )
+        return Response(serializer.data)
+
+    @action(
+        detail=False, methods=['get'],
+        permission_classes=[permissions.IsAuthenticated],
+        renderer_classes=[
+            ShoppingListTextRenderer,
+            ShoppingListCSVRenderer,
+            ShoppingListJSONLinesRenderer,
+        ]
+    )
     def download_shopping_cart(self, request):
-        user = request.user
-        shopping_list = ShoppingCart.objects.filter(user=user)
-        recipe_ids = shopping_list.values_list('recipe_id', flat=True)
-        recipes = Recipe.objects.filter(id__in=recipe_ids)
-        content = self.generate_shopping_list_text(recipes)
-        response = HttpResponse(content, content_type='text/plain')
+        renderer = request.accepted_renderer
+        rows = self.get_shopping_list(request.user).iterator(
+            chunk_size=SHOPPING_LIST_CHUNK_SIZE
+        )
+        response = StreamingHttpResponse(
+            renderer.render_rows(rows),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}'
+        )
         response['Content-Disposition'] = (
-            'attachment; filename="shopping_list.txt"'
+            f'attachment; filename="shopping_list.{renderer.format}"'
         )
         return response
-
-    def generate_shopping_list_text(self, recipes):
-        shopping_list = defaultdict(float)
-        for recipe in recipes:
-            ingredients_in_recipe = IngredientsInRecipe.objects.filter(
-                recipe=recipe
-            )
-            for ingredient in ingredients_in_recipe:
-                name = ingredient.ingredient.name
-                unit = ingredient.ingredient.measurement_unit
-                amount = ingredient.amount
-                shopping_list[(name, unit)] += amount
-        content = StringIO()
-        for (name, unit), amount in shopping_list.items():
-            content.write(f'{name} ({unit}) — {amount}\n')
-        return content.getvalue()
@@ -3,24 +3,28 @@ from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import Group
 from rest_framework.authtoken.models import TokenProxy
 
+from recipes.admin import LargeTableAdmin
 from .models import User, Follow
 
 
 @admin.register(User)
-class UserAdmin(UserAdmin):
+class UserAdmin(UserAdmin, LargeTableAdmin):
     list_display = (
         'pk', 'username', 'email',
-        'password', 'first_name', 'last_name'
+        'password', 'first_name', 'last_name',
+        'recipes_count', 'followers_count'
     )
-    list_filter = ('username', 'email')
+    list_filter = ('is_staff', 'is_active')
     search_fields = ('username', 'email')
     empty_value_display = '-пусто-'
 
 
 @admin.register(Follow)
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(LargeTableAdmin):
     list_display = ('pk', 'user', 'author')
     list_editable = ('user', 'author')
+    list_select_related = ('user', 'author')
+    autocomplete_fields = ('user', 'author')
 
 
 admin.site.unregister(Group)
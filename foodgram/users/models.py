@@ -24,6 +24,8 @@ class User(AbstractUser):
     )
     first_name = models.CharField(max_length=USER_MAX_LEN)
     last_name = models.CharField(max_length=USER_MAX_LEN)
+    recipes_count = models.PositiveIntegerField(default=0, editable=False)
+    followers_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ['last_name', 'first_name']
@@ -57,6 +59,11 @@ class Follow(models.Model):
                 name='user_not_equal_author'
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=['author', 'user'], name='follow_author_user_idx'
+            ),
+        ]
         verbose_name = 'Подписка на автора'
         verbose_name_plural = 'Подписки'
 
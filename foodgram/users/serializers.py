@@ -2,10 +2,13 @@ from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
 from .models import User, Follow
+from recipes.fields import RenditionField
+from recipes.instrumentation import TimedSerializerMixin
+from recipes.membership import FOLLOWS, is_member
 from recipes.models import Recipe
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
 
     class Meta:
@@ -16,15 +19,9 @@ class UserSerializer(serializers.ModelSerializer):
         )
 
     def get_is_subscribed(self, obj):
-        return (
-            bool(
-                self.context.get('request')
-                and self.context['request'].user.is_authenticated
-                and obj.follow.filter(
-                    user=self.context['request'].user
-                ).exists()
-            )
-        )
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
+        return is_member(self.context, FOLLOWS, obj.id)
 
 
 class UserCreateSerializer(serializers.ModelSerializer):
@@ -54,9 +51,12 @@ class UserCreateSerializer(serializers.ModelSerializer):
 
 
 class RecipeOnFollowSerializer(serializers.ModelSerializer):
+    image = RenditionField(rendition='thumbnail')
+    image_webp = RenditionField(rendition='thumbnail', image_format='webp')
+
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_webp', 'cooking_time')
 
 
 class FollowSerializer(UserSerializer):
@@ -70,20 +70,16 @@ class FollowSerializer(UserSerializer):
         )
 
     def get_recipes(self, obj):
-        limit = self.context['request'].query_params.get('recipes_limit')
         recipes_by_author = obj.recipes.all()
-        if limit:
-            try:
-                limit = int(limit)
-                recipes_by_author = recipes_by_author[:limit]
-            except ValueError:
-                raise ValueError('Неверный формат')
+        limit = self.context.get('recipes_limit')
+        if limit is not None:
+            recipes_by_author = recipes_by_author[:limit]
         return RecipeOnFollowSerializer(
             recipes_by_author, many=True, context=self.context
         ).data
 
     def get_recipes_count(self, obj):
-        return obj.recipes.count()
+        return obj.recipes_count
 
 
 class FollowCreateSerializer(serializers.ModelSerializer):
@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from recipes.concurrency import async_urls
 from .views import UserViewSet
 
 
@@ -9,8 +11,12 @@ app_name = 'users'
 router = DefaultRouter()
 router.register('users', UserViewSet, basename='users')
 
+urls = router.urls
+if settings.ASYNC_VIEWS:
+    urls = async_urls(urls, ('users-subscriptions',))
+
 urlpatterns = [
-    path('', include(router.urls)),
+    path('', include(urls)),
     path('auth/', include('djoser.urls')),
     path('auth/', include('djoser.urls.authtoken')),
 ]
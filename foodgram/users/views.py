@@ -3,7 +3,11 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.serializers import ValidationError
 from djoser.views import UserViewSet
+from django.db.models import (
+    BooleanField, OuterRef, Prefetch, Subquery, Value
+)
 
+from recipes.models import Recipe
 from recipes.pagination import CustomPagination
 from .models import User
 from .serializers import (
@@ -22,6 +26,26 @@ class UserViewSet(UserViewSet):
     def get_queryset(self):
         return User.objects.all()
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ('subscribe', 'subscriptions'):
+            context['recipes_limit'] = self.get_recipes_limit()
+        return context
+
+    def get_recipes_limit(self):
+        limit = self.request.query_params.get('recipes_limit')
+        if limit is None:
+            return None
+        try:
+            limit = int(limit)
+            if limit < 0:
+                raise ValueError
+        except ValueError:
+            raise ValidationError(
+                {'recipes_limit': ['Неверный формат']}
+            )
+        return limit
+
     def create(self, request):
         serializer = UserCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -67,10 +91,24 @@ class UserViewSet(UserViewSet):
         serializer_class=FollowSerializer
     )
     def subscriptions(self, request):
-        queryset = User.objects.filter(follow__user=self.request.user)
+        context = self.get_serializer_context()
+        recipes = Recipe.objects.all()
+        if context['recipes_limit'] is not None:
+            recipes = recipes.filter(pk__in=Subquery(
+                Recipe.objects.filter(
+                    author=OuterRef('author')
+                ).values('pk')[:context['recipes_limit']]
+            ))
+        queryset = User.objects.filter(
+            follow__user=self.request.user
+        ).annotate(
+            is_subscribed=Value(True, output_field=BooleanField())
+        ).prefetch_related(
+            Prefetch('recipes', queryset=recipes)
+        ).order_by('last_name', 'first_name')
         paginator = CustomPagination()
         result_page = paginator.paginate_queryset(queryset, request)
         serializer = FollowSerializer(
-            result_page, many=True, context={'request': request}
+            result_page, many=True, context=context
         )
         return paginator.get_paginated_response(serializer.data)